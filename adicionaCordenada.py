@@ -1,36 +1,55 @@
 import csv
-from geopy.geocoders import Nominatim
-import time
+import sys
+import geocache
 
 # Nome do arquivo CSV
 INPUT_CSV = "words_from_webpage.csv"
 OUTPUT_CSV = "words_from_webpage_updated.csv"
+# Tabela de dimensão: uma linha por evento em vez de repetir as coordenadas em cada palavra
+EVENTS_CSV = "eventos_coordenadas.csv"
 
-def get_coordinates(location, cache):
-    """Converte um nome de local em coordenadas geográficas, utilizando cache."""
-    if location in cache:
-        # Retorna coordenadas do cache, se disponíveis
-        return cache[location]
-    
-    geolocator = Nominatim(user_agent="geo_converter")
-    try:
-        location_data = geolocator.geocode(location)
-        if location_data:
-            coords = f"{location_data.latitude}, {location_data.longitude}"
-        else:
-            coords = "Não encontrado"
-    except Exception as e:
-        print(f"Erro ao obter coordenadas para {location}: {e}")
-        coords = "Erro"
-
-    # Armazena no cache
-    cache[location] = coords
-    return coords
-
-def process_csv(input_csv, output_csv):
-    """Processa o CSV de entrada e escreve no CSV de saída linha por linha."""
-    cache = {}  # Dicionário para armazenar eventos já processados
+PROVIDER = "nominatim"
+WORKERS = 4
 
+
+def format_coordinates(place):
+    """Converte o resultado do geocache no texto usado na coluna Coordenadas."""
+    if place is None:
+        return "Erro"
+    if place["lat"] is not None:
+        return f"{place['lat']}, {place['lon']}"
+    return "Não encontrado"
+
+
+def distinct_events(input_csv):
+    """Fase 1a: lê o CSV em streaming e devolve os eventos distintos, na ordem em que aparecem."""
+    events = {}
+    with open(input_csv, 'r', encoding='utf-8') as infile:
+        for row in csv.DictReader(infile):
+            events.setdefault(row['Evento'], None)
+    return list(events)
+
+
+def resolve_events(events, workers=WORKERS):
+    """Fase 1b: geocodifica os eventos distintos de uma vez, em paralelo e dentro do limite do provedor."""
+    places = geocache.lookup_many(events, provider=PROVIDER, need_coords=True, workers=workers)
+    return {evento: places[evento] for evento in events}
+
+
+def write_events_table(places, events_csv):
+    with open(events_csv, 'w', encoding='utf-8', newline='') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(['Evento', 'Latitude', 'Longitude', 'Coordenadas'])
+        for evento, place in places.items():
+            lat = place["lat"] if place else None
+            lon = place["lon"] if place else None
+            writer.writerow([evento, lat, lon, format_coordinates(place)])
+
+    print(f"Tabela de eventos salva como: {events_csv} ({len(places)} eventos)")
+
+
+def join_coordinates(input_csv, output_csv, coords):
+    """Fase 2: copia o CSV de entrada para a saída acrescentando a coluna via dicionário."""
     with open(input_csv, 'r', encoding='utf-8') as infile, \
          open(output_csv, 'w', encoding='utf-8', newline='') as outfile:
 
@@ -42,15 +61,34 @@ def process_csv(input_csv, output_csv):
         writer.writeheader()
 
         for row in reader:
-            evento = row['Evento']
-            if evento not in cache:
-                print(f"Obtendo coordenadas para: {evento}")
-            coordenadas = get_coordinates(evento, cache)
-            row['Coordenadas'] = coordenadas
+            row['Coordenadas'] = coords[row['Evento']]
             writer.writerow(row)  # Escreve a linha no arquivo de saída
-            time.sleep(1)  # Evita excesso de consultas ao serviço de geocodificação
 
-    print(f"Processamento concluído! CSV salvo como: {output_csv}")
+
+def process_csv(input_csv, output_csv, events_csv=None, workers=WORKERS):
+    """Enriquece o CSV com coordenadas geocodificando cada evento distinto uma única vez.
+
+    Com output_csv=None só a tabela de eventos (events_csv) é gerada.
+    """
+    events = distinct_events(input_csv)
+    print(f"{len(events)} eventos distintos em {input_csv}")
+
+    places = resolve_events(events, workers)
+
+    if events_csv:
+        write_events_table(places, events_csv)
+
+    if output_csv:
+        coords = {evento: format_coordinates(place) for evento, place in places.items()}
+        join_coordinates(input_csv, output_csv, coords)
+        print(f"Processamento concluído! CSV salvo como: {output_csv}")
+
 
 if __name__ == "__main__":
-    process_csv(INPUT_CSV, OUTPUT_CSV)
+    # --eventos: grava só a tabela de dimensão; --eventos-e-linhas: grava as duas saídas
+    if "--eventos" in sys.argv:
+        process_csv(INPUT_CSV, None, EVENTS_CSV)
+    elif "--eventos-e-linhas" in sys.argv:
+        process_csv(INPUT_CSV, OUTPUT_CSV, EVENTS_CSV)
+    else:
+        process_csv(INPUT_CSV, OUTPUT_CSV)
@@ -0,0 +1,392 @@
+import csv
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+
+import word_store
+from export_columnar import split_event
+
+DB_FILE = os.getenv("ANALYTICS_DB", "analytics.sqlite")
+
+EVENTS_CSV = "events_check.csv"
+TALKS_CSV = "talks_program.csv"
+# Fonte de termos → CSV de palavras (o de frequência *_tf.csv é usado quando existe)
+TERM_SOURCES = {
+    "pdf": "words_from_pdfs.csv",
+    "web": "words_from_webpage.csv",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    year INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    city TEXT,
+    country TEXT,
+    link TEXT,
+    have_site INTEGER,
+    have_program INTEGER,
+    have_video INTEGER,
+    have_slide INTEGER,
+    considered INTEGER,
+    video_link TEXT,
+    slide_link TEXT,
+    UNIQUE (year, name)
+);
+CREATE INDEX IF NOT EXISTS events_year ON events (year);
+CREATE INDEX IF NOT EXISTS events_country ON events (country, year);
+CREATE INDEX IF NOT EXISTS events_city ON events (year, city);
+
+CREATE TABLE IF NOT EXISTS authors (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS talks (
+    id INTEGER PRIMARY KEY,
+    event_id INTEGER NOT NULL REFERENCES events (id),
+    author_id INTEGER NOT NULL REFERENCES authors (id),
+    title TEXT NOT NULL,
+    link TEXT,
+    load_id INTEGER NOT NULL,
+    UNIQUE (event_id, author_id, title)
+);
+CREATE INDEX IF NOT EXISTS talks_author ON talks (author_id);
+
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS term_counts (
+    term_id INTEGER NOT NULL REFERENCES terms (id),
+    source TEXT NOT NULL,
+    event_id INTEGER NOT NULL REFERENCES events (id),
+    count INTEGER NOT NULL,
+    load_id INTEGER NOT NULL,
+    PRIMARY KEY (term_id, source, event_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS term_counts_event ON term_counts (event_id, source);
+
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    load_id INTEGER NOT NULL,
+    loaded_at REAL NOT NULL
+);
+"""
+
+# Índice full-text dos títulos, mantido em sincronia com talks por triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS talks_fts USING fts5 (
+    title, content='talks', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS talks_ai AFTER INSERT ON talks BEGIN
+    INSERT INTO talks_fts (rowid, title) VALUES (new.id, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS talks_ad AFTER DELETE ON talks BEGIN
+    INSERT INTO talks_fts (talks_fts, rowid, title) VALUES ('delete', old.id, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS talks_au AFTER UPDATE OF title ON talks BEGIN
+    INSERT INTO talks_fts (talks_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    INSERT INTO talks_fts (rowid, title) VALUES (new.id, new.title);
+END;
+"""
+
+
+def connect(path=DB_FILE):
+    db = sqlite3.connect(path, timeout=30)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("PRAGMA foreign_keys=ON")
+    db.executescript(SCHEMA)
+    try:
+        db.executescript(FTS_SCHEMA)
+    except sqlite3.OperationalError as e:
+        # SQLite compilado sem FTS5: a busca por título cai para LIKE
+        print(f"FTS5 indisponível ({e}); busca por título sem índice full-text.")
+    return db
+
+
+def has_fts(db):
+    return db.execute("SELECT 1 FROM sqlite_master WHERE name = 'talks_fts'").fetchone() is not None
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def begin_load(db, path, force=False):
+    """Retorna um load_id novo se o arquivo mudou desde a última carga, senão None."""
+    stat = os.stat(path)
+    row = db.execute("SELECT * FROM sources WHERE path = ?", (path,)).fetchone()
+    if row and not force and row["size"] == stat.st_size and row["mtime_ns"] == stat.st_mtime_ns:
+        return None
+
+    digest = file_sha256(path)
+    if row and not force and row["sha256"] == digest:
+        # Só o mtime mudou (ex.: reescrita atômica com o mesmo conteúdo)
+        db.execute("UPDATE sources SET mtime_ns = ? WHERE path = ?", (stat.st_mtime_ns, path))
+        return None
+
+    # Global entre fontes: um CSV de termos que troca de arquivo (*_tf.csv) não reaproveita ids antigos
+    load_id = db.execute("SELECT COALESCE(MAX(load_id), 0) + 1 FROM sources").fetchone()[0]
+    db.execute(
+        """
+        INSERT INTO sources (path, size, mtime_ns, sha256, load_id, loaded_at) VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (path) DO UPDATE SET
+            size = excluded.size, mtime_ns = excluded.mtime_ns, sha256 = excluded.sha256,
+            load_id = excluded.load_id, loaded_at = excluded.loaded_at
+        """,
+        (path, stat.st_size, stat.st_mtime_ns, digest, load_id, time.time()),
+    )
+    return load_id
+
+
+def flag(value):
+    value = (value or "").strip().lower()
+    return None if value == "" else int(value == "true")
+
+
+class Loader:
+    """Resolve nomes em ids (eventos, autores, termos) com cache em memória durante uma carga."""
+
+    def __init__(self, db):
+        self.db = db
+        self.events = {}
+        self.authors = {}
+        self.terms = {}
+
+    def event_id(self, year, name):
+        year = int(year)
+        key = (year, name)
+        if key in self.events:
+            return self.events[key]
+
+        row = self.db.execute("SELECT id FROM events WHERE year = ? AND name = ?", key).fetchone()
+        city, country = split_event(name)
+        if row is None and country is None:
+            # "Ghent" (CSV antigo de palavras) é o mesmo evento que "Ghent - Belgium" no mesmo ano
+            matches = self.db.execute(
+                "SELECT id FROM events WHERE year = ? AND city = ? LIMIT 2", (year, city)
+            ).fetchall()
+            if len(matches) == 1:
+                row = matches[0]
+        if row is None:
+            row = self.db.execute(
+                "INSERT INTO events (year, name, city, country) VALUES (?, ?, ?, ?) RETURNING id",
+                (year, name, city, country),
+            ).fetchone()
+
+        self.events[key] = row["id"]
+        return row["id"]
+
+    def _named_id(self, table, column, cache, value):
+        if value not in cache:
+            cache[value] = self.db.execute(
+                f"INSERT INTO {table} ({column}) VALUES (?) "
+                f"ON CONFLICT ({column}) DO UPDATE SET {column} = excluded.{column} RETURNING id",
+                (value,),
+            ).fetchone()["id"]
+        return cache[value]
+
+    def author_id(self, name):
+        return self._named_id("authors", "name", self.authors, name)
+
+    def term_id(self, term):
+        return self._named_id("terms", "term", self.terms, term)
+
+    def load_events(self, path=EVENTS_CSV):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            rows = 0
+            for row in csv.DictReader(f):
+                year, name = int(row["Ano"]), row["Evento"]
+                city, country = split_event(name)
+                self.db.execute(
+                    """
+                    INSERT INTO events (year, name, city, country, link, have_site, have_program,
+                                        have_video, have_slide, considered, video_link, slide_link)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (year, name) DO UPDATE SET
+                        city = excluded.city, country = excluded.country, link = excluded.link,
+                        have_site = excluded.have_site, have_program = excluded.have_program,
+                        have_video = excluded.have_video, have_slide = excluded.have_slide,
+                        considered = excluded.considered, video_link = excluded.video_link,
+                        slide_link = excluded.slide_link
+                    """,
+                    (
+                        year, name, city, country, row["Link"],
+                        flag(row["haveSite"]), flag(row["haveProgram"]), flag(row["haveVideo"]),
+                        flag(row["haveSlide"]), flag(row["considered"]),
+                        row.get("videoLink") or None, row.get("slideLink") or None,
+                    ),
+                )
+                rows += 1
+        return rows
+
+    def load_talks(self, load_id, path=TALKS_CSV):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            rows = 0
+            for row in csv.DictReader(f):
+                if not row["ano"] or not row["titulo"]:
+                    continue
+                self.db.execute(
+                    """
+                    INSERT INTO talks (event_id, author_id, title, link, load_id) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (event_id, author_id, title) DO UPDATE SET
+                        link = excluded.link, load_id = excluded.load_id
+                    """,
+                    (
+                        self.event_id(row["ano"], row["local"]),
+                        self.author_id(row["autor"].strip()),
+                        row["titulo"].strip(),
+                        row["link"] or None,
+                        load_id,
+                    ),
+                )
+                rows += 1
+
+        # Talks que sumiram do CSV saem do banco
+        self.db.execute("DELETE FROM talks WHERE load_id <> ?", (load_id,))
+        return rows
+
+    def load_terms(self, source, load_id, path):
+        totals = word_store.aggregate(path)
+        self.db.executemany(
+            """
+            INSERT INTO term_counts (term_id, source, event_id, count, load_id) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (term_id, source, event_id) DO UPDATE SET
+                count = excluded.count, load_id = excluded.load_id
+            """,
+            (
+                (self.term_id(term), source, self.event_id(year, event), count, load_id)
+                for (year, event, term), count in totals.items()
+            ),
+        )
+        self.db.execute("DELETE FROM term_counts WHERE source = ? AND load_id <> ?", (source, load_id))
+        return len(totals)
+
+
+def term_source_path(output_csv):
+    tf = word_store.tf_path(output_csv)
+    return tf if os.path.isfile(tf) else output_csv
+
+
+def load_all(db, force=False):
+    """Carga incremental: cada CSV só é relido se mudou desde a última carga."""
+    loader = Loader(db)
+    jobs = [("eventos", EVENTS_CSV, lambda load_id: loader.load_events(EVENTS_CSV))]
+    jobs.append(("talks", TALKS_CSV, lambda load_id: loader.load_talks(load_id, TALKS_CSV)))
+    for source, output_csv in TERM_SOURCES.items():
+        path = term_source_path(output_csv)
+        jobs.append((f"termos ({source})", path, lambda load_id, s=source, p=path: loader.load_terms(s, load_id, p)))
+
+    for label, path, load in jobs:
+        if not os.path.isfile(path):
+            print(f"Pulando {label}: {path} não encontrado.")
+            continue
+
+        start = time.perf_counter()
+        with db:
+            load_id = begin_load(db, path, force)
+            if load_id is None:
+                print(f"{label}: {path} inalterado.")
+                continue
+            rows = load(load_id)
+        print(f"{label}: {rows} linhas de {path} em {time.perf_counter() - start:.1f}s")
+
+    if has_fts(db):
+        with db:
+            db.execute("INSERT INTO talks_fts (talks_fts) VALUES ('optimize')")
+
+
+def top_terms(db, country=None, year_from=None, year_to=None, source=None, n=20):
+    sql = """
+        SELECT t.term, SUM(c.count) AS total
+        FROM term_counts c
+        JOIN events e ON e.id = c.event_id
+        JOIN terms t ON t.id = c.term_id
+        WHERE 1 = 1
+    """
+    params = []
+    for clause, value in (
+        ("e.country = ?", country),
+        ("e.year >= ?", year_from),
+        ("e.year <= ?", year_to),
+        ("c.source = ?", source),
+    ):
+        if value is not None:
+            sql += f" AND {clause}"
+            params.append(value)
+    sql += " GROUP BY c.term_id ORDER BY total DESC LIMIT ?"
+    return db.execute(sql, params + [n]).fetchall()
+
+
+def talks_by_author(db, name):
+    return db.execute(
+        """
+        SELECT e.year, e.name AS event, a.name AS author, t.title, t.link
+        FROM talks t
+        JOIN authors a ON a.id = t.author_id
+        JOIN events e ON e.id = t.event_id
+        WHERE a.name = ?
+        ORDER BY e.year
+        """,
+        (name,),
+    ).fetchall()
+
+
+def events_with_slides_no_video(db):
+    return db.execute(
+        "SELECT year, name, link FROM events WHERE have_slide = 1 AND have_video = 0 ORDER BY year, name"
+    ).fetchall()
+
+
+def search_titles(db, query, n=50):
+    """Busca full-text nos títulos das talks (sintaxe FTS5: palavras, "frases", prefixo*)."""
+    if has_fts(db):
+        sql = """
+            SELECT e.year, e.name AS event, a.name AS author, t.title, t.link
+            FROM talks_fts
+            JOIN talks t ON t.id = talks_fts.rowid
+            JOIN authors a ON a.id = t.author_id
+            JOIN events e ON e.id = t.event_id
+            WHERE talks_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        """
+        return db.execute(sql, (query, n)).fetchall()
+
+    sql = """
+        SELECT e.year, e.name AS event, a.name AS author, t.title, t.link
+        FROM talks t
+        JOIN authors a ON a.id = t.author_id
+        JOIN events e ON e.id = t.event_id
+        WHERE t.title LIKE ?
+        LIMIT ?
+    """
+    return db.execute(sql, (f"%{query}%", n)).fetchall()
+
+
+def main():
+    db = connect()
+    # --recarregar ignora o registro de arquivos já carregados
+    load_all(db, force="--recarregar" in sys.argv)
+
+    if "--buscar" in sys.argv:
+        query = sys.argv[sys.argv.index("--buscar") + 1]
+        for row in search_titles(db, query):
+            print(f"{row['year']} | {row['event']} | {row['author']} | {row['title']}")
+
+
+if __name__ == "__main__":
+    main()
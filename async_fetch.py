@@ -0,0 +1,114 @@
+import asyncio
+import time
+from urllib.parse import urlparse
+
+import httpx
+
+import http_cache
+from http_client import MAX_RETRIES, RETRY_STATUSES, backoff_delay, client_options
+
+# Limites por host: (requisições simultâneas, requisições/segundo, rajada)
+HOST_LIMITS = {
+    "devopsdays.org": (8, 4.0, 8),
+    "legacy.devopsdays.org": (4, 2.0, 4),
+}
+DEFAULT_LIMIT = (4, 2.0, 4)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostLimiter:
+    def __init__(self, concurrency, rate, burst):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(rate, burst)
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        try:
+            await self.bucket.acquire()
+        except BaseException:
+            self.semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+class AsyncFetcher:
+    def __init__(self, host_limits=None, default_limit=DEFAULT_LIMIT):
+        self.host_limits = dict(HOST_LIMITS if host_limits is None else host_limits)
+        self.default_limit = default_limit
+        self.limiters = {}
+        self.client = None
+        # url pedida → url final, só para as que passaram por redirect
+        self.redirects = {}
+
+    def limiter(self, url):
+        host = urlparse(url).hostname or ""
+        if host not in self.limiters:
+            self.limiters[host] = HostLimiter(*self.host_limits.get(host, self.default_limit))
+        return self.limiters[host]
+
+    async def __aenter__(self):
+        max_connections = sum(c for c, _, _ in self.host_limits.values()) + self.default_limit[0]
+        options = client_options()
+        options["limits"] = httpx.Limits(max_connections=max_connections)
+        self.client = httpx.AsyncClient(**options)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+
+    async def fetch(self, url):
+        entry, hit, text = http_cache.cached_text(url)
+        if entry is not None and entry["final_url"]:
+            self.redirects[url] = entry["final_url"]
+        if hit:
+            return text
+
+        headers = http_cache.conditional_headers(entry)
+
+        for attempt in range(MAX_RETRIES + 1):
+            resp = None
+            async with self.limiter(url):
+                try:
+                    resp = await self.client.get(url, headers=headers)
+                except httpx.TransportError:
+                    if attempt == MAX_RETRIES:
+                        return None
+                except httpx.HTTPError:
+                    return None
+
+            if resp is not None and (resp.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES):
+                break
+
+            await asyncio.sleep(backoff_delay(attempt, resp))
+
+        if resp is not None and str(resp.url) != url:
+            self.redirects[url] = str(resp.url)
+        return http_cache.resolve(url, entry, resp)
+
+    def final_url(self, url):
+        """URL de onde a página realmente veio (depois dos redirects); base para resolver links relativos."""
+        return self.redirects.get(url, url)
@@ -0,0 +1,155 @@
+import asyncio
+import base64
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import os
+import zlib
+from urllib.parse import urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url):
+    """Forma canônica para deduplicar: esquema/host minúsculos, sem porta padrão, query, fragmento nem barra final."""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    return urlunsplit((scheme, host, path, "", ""))
+
+
+class BloomFilter:
+    """Conjunto aproximado de tamanho fixo para crawls grandes (falsos positivos ~error_rate)."""
+
+    def __init__(self, capacity=1_000_000, error_rate=0.001, bits=None):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def to_json(self):
+        return {
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "bits": base64.b64encode(zlib.compress(bytes(self.bits))).decode("ascii"),
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        bits = bytearray(zlib.decompress(base64.b64decode(data["bits"])))
+        return cls(data["capacity"], data["error_rate"], bits)
+
+
+class Frontier:
+    """Fila de prioridade de URLs a visitar com deduplicação por URL normalizada.
+
+    Menor prioridade sai primeiro; no empate, menor profundidade (BFS).
+    As URLs em andamento entram no checkpoint como pendentes.
+    """
+
+    def __init__(self, seen=None):
+        self.heap = []
+        self.seen = set() if seen is None else seen
+        self.in_flight = {}
+        self.counter = itertools.count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, url, depth, priority):
+        # A forma normalizada só serve de chave de deduplicação; a fila guarda a URL original
+        key = normalize_url(url)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        heapq.heappush(self.heap, (priority, depth, next(self.counter), url))
+        return True
+
+    def pop(self):
+        if not self.heap:
+            return None
+        priority, depth, _, url = heapq.heappop(self.heap)
+        self.in_flight[url] = (priority, depth)
+        return url, depth
+
+    def done(self, url):
+        self.in_flight.pop(url, None)
+
+    @property
+    def idle(self):
+        return not self.heap and not self.in_flight
+
+    def save(self, path, extra=None):
+        pending = [(p, d, url) for p, d, _, url in self.heap]
+        pending += [(p, d, url) for url, (p, d) in self.in_flight.items()]
+        state = {
+            "pending": sorted(pending),
+            "seen": self.seen.to_json() if isinstance(self.seen, BloomFilter) else sorted(self.seen),
+            "extra": extra or {},
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+
+        seen = state["seen"]
+        frontier = cls(BloomFilter.from_json(seen) if isinstance(seen, dict) else set(seen))
+        for priority, depth, url in state["pending"]:
+            heapq.heappush(frontier.heap, (priority, depth, next(frontier.counter), url))
+        return frontier, state.get("extra", {})
+
+
+class RobotsCache:
+    """robots.txt por host, baixado uma vez pelo mesmo fetcher do crawl."""
+
+    def __init__(self, fetcher, user_agent="*"):
+        self.fetcher = fetcher
+        self.user_agent = user_agent
+        self.parsers = {}
+
+    async def _load(self, origin):
+        parser = RobotFileParser(origin + "/robots.txt")
+        text = await self.fetcher.fetch(origin + "/robots.txt")
+        # Sem robots.txt (404/erro) tudo é permitido
+        parser.parse((text or "").splitlines())
+        return parser
+
+    async def allowed(self, url):
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+
+        # Guarda a task, não o resultado: workers simultâneos esperam o mesmo download
+        if origin not in self.parsers:
+            self.parsers[origin] = asyncio.ensure_future(self._load(origin))
+        parser = await self.parsers[origin]
+
+        return parser.can_fetch(self.user_agent, url)
@@ -0,0 +1,118 @@
+import csv
+import heapq
+import os
+import sys
+import tempfile
+from contextlib import ExitStack
+
+# Linhas por run ordenado em memória no merge externo
+RUN_SIZE = 200_000
+
+
+def year_key(row):
+    return int(row[0])
+
+
+def _atomic_writer(path):
+    """Arquivo temporário no mesmo diretório do destino, para trocar com os.replace no fim."""
+    fd, tmp = tempfile.mkstemp(prefix=".sort-", suffix=".csv", dir=os.path.dirname(os.path.abspath(path)))
+    os.chmod(tmp, os.stat(path).st_mode & 0o777)
+    return os.fdopen(fd, "w", encoding="utf-8", newline=""), tmp
+
+
+def _write_run(rows, tmpdir):
+    fd, path = tempfile.mkstemp(suffix=".run.csv", dir=tmpdir)
+    with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerows(rows)
+    return path
+
+
+def external_sort(path, key, run_size=RUN_SIZE):
+    """Merge sort externo: runs ordenados em arquivos temporários + merge k-way com heapq.merge.
+
+    A memória fica limitada a run_size linhas e o arquivo original só é
+    substituído (atomicamente) quando a saída está completa.
+    """
+    with tempfile.TemporaryDirectory(prefix="csv-sort-") as tmpdir:
+        runs = []
+        with open(path, "r", encoding="utf-8", newline="") as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader, None)
+            if header is None:
+                return
+
+            rows = []
+            for row in reader:
+                rows.append(row)
+                if len(rows) >= run_size:
+                    rows.sort(key=key)
+                    runs.append(_write_run(rows, tmpdir))
+                    rows = []
+            rows.sort(key=key)
+
+        out, tmp = _atomic_writer(path)
+        try:
+            with out, ExitStack() as stack:
+                files = [stack.enter_context(open(run, "r", encoding="utf-8", newline="")) for run in runs]
+                writer = csv.writer(out)
+                writer.writerow(header)
+                # heapq.merge é estável entre os iteráveis, na ordem em que são passados
+                writer.writerows(heapq.merge(*(csv.reader(f) for f in files), rows, key=key))
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+
+def bucket_sort_by_year(path):
+    """Caminho rápido O(n): distribui as linhas em um arquivo temporário por ano e concatena."""
+    with tempfile.TemporaryDirectory(prefix="csv-sort-") as tmpdir:
+        buckets = {}
+        with open(path, "r", encoding="utf-8", newline="") as csvfile, ExitStack() as stack:
+            reader = csv.reader(csvfile)
+            header = next(reader, None)
+            if header is None:
+                return
+
+            for row in reader:
+                year = year_key(row)
+                if year not in buckets:
+                    f = stack.enter_context(
+                        open(os.path.join(tmpdir, f"{year}.csv"), "w", encoding="utf-8", newline="")
+                    )
+                    buckets[year] = (f, csv.writer(f))
+                buckets[year][1].writerow(row)
+
+        out, tmp = _atomic_writer(path)
+        try:
+            with out:
+                csv.writer(out).writerow(header)
+                for year in sorted(buckets):
+                    with open(os.path.join(tmpdir, f"{year}.csv"), "r", encoding="utf-8", newline="") as f:
+                        while chunk := f.read(1 << 20):
+                            out.write(chunk)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+
+def sort_csv_by_year(output_csv, buckets=True):
+    """Ordena o CSV pela primeira coluna (ano) sem carregar o arquivo inteiro em memória."""
+    if not os.path.isfile(output_csv):
+        print("CSV ainda não existe, nada para ordenar.")
+        return
+
+    if buckets:
+        bucket_sort_by_year(output_csv)
+    else:
+        external_sort(output_csv, year_key)
+
+    print("CSV ordenado por ano com sucesso!")
+
+
+if __name__ == "__main__":
+    # --merge força o merge sort externo em vez do caminho por baldes de ano
+    buckets = "--merge" not in sys.argv
+    for path in [arg for arg in sys.argv[1:] if not arg.startswith("--")]:
+        sort_csv_by_year(path, buckets)
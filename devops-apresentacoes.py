@@ -1,73 +1,150 @@
+import asyncio
 import os
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+import sys
+from urllib.parse import urljoin, urlsplit
+from async_fetch import AsyncFetcher
+from crawl_frontier import BloomFilter, Frontier, RobotsCache
+import downloader
+import html_parse
 
 # Base URL of DevOpsDays events
 BASE_URL = "https://devopsdays.org/events/"
+ALLOWED_HOSTS = {"devopsdays.org", "www.devopsdays.org"}
+MAX_DEPTH = 6
+WORKERS = 8
+CHECKPOINT_FILE = "crawl_checkpoint.json"
+CHECKPOINT_EVERY = 100
 
-def download_pdf(pdf_url, save_path):
-    """Download a PDF file."""
-    response = requests.get(pdf_url, stream=True)
-    if response.status_code == 200:
-        with open(save_path, "wb") as pdf_file:
-            for chunk in response.iter_content(chunk_size=1024):
-                pdf_file.write(chunk)
-        print(f"Downloaded: {save_path}")
-    else:
-        print(f"Failed to download: {pdf_url}")
-
-def create_folder_structure(base_dir, year, event_name):
-    """Create folder structure for year and event."""
-    year_folder = os.path.join(base_dir, year)
-    event_folder = os.path.join(year_folder, event_name)
-    os.makedirs(event_folder, exist_ok=True)
-    return event_folder
-
-def find_pdfs_and_links(url, visited, base_dir):
-    """Recursively find all PDFs and links on a webpage."""
-    if url in visited:
-        return
-    visited.add(url)
+# Pages most likely to link to slides are crawled first
+PRIORITY_HINTS = [
+    ("/program", 0),
+    ("/talks", 1),
+    ("/speakers", 1),
+    ("/presentations", 1),
+    ("/slides", 1),
+]
+DEFAULT_PRIORITY = 2
 
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        print(f"Failed to fetch {url}: {e}")
-        return
 
-    soup = BeautifulSoup(response.content, "html.parser")
+def url_priority(url):
+    path = urlsplit(url).path.lower()
+    for hint, priority in PRIORITY_HINTS:
+        if hint in path:
+            return priority
+    return DEFAULT_PRIORITY
+
+
+def in_scope(url):
+    """Only pages under BASE_URL on the DevOpsDays hosts are crawled."""
+    parts = urlsplit(url)
+    return (parts.hostname or "").lower() in ALLOWED_HOSTS and parts.path.startswith(urlsplit(BASE_URL).path)
+
 
-    # Extract event year and name from the URL
+def event_folder_for(url, base_dir):
+    """Folder for PDFs found on a page, from the event year and name in the URL."""
     event_parts = url.strip("/").split("/")[-3:]
-    year, event_name = None, None
     if len(event_parts) >= 2 and event_parts[-2].isdigit():
-        year = event_parts[-2]
-        event_name = event_parts[-1]
-        event_folder = create_folder_structure(base_dir, year, event_name)
-    else:
-        event_folder = base_dir
+        return os.path.join(base_dir, event_parts[-2], event_parts[-1])
+    return base_dir
+
+
+async def crawl(frontier, pdfs, base_dir, workers=WORKERS, checkpoint=CHECKPOINT_FILE):
+    """Crawl the frontier with concurrent workers, collecting PDF links in pdfs ({url: save_path})."""
+    visited = 0
+
+    async with AsyncFetcher() as fetcher:
+        robots = RobotsCache(fetcher)
+
+        async def worker():
+            nonlocal visited
+            while True:
+                item = frontier.pop()
+                if item is None:
+                    if frontier.idle:
+                        return
+                    await asyncio.sleep(0.05)
+                    continue
+
+                url, depth = item
+                try:
+                    if not await robots.allowed(url):
+                        print(f"Blocked by robots.txt: {url}")
+                        continue
+
+                    html = await fetcher.fetch(url)
+                    if not html:
+                        print(f"Failed to fetch {url}")
+                        continue
 
-    # Download all PDF links on the page
-    for link in soup.find_all("a", href=True):
-        href = link['href']
-        full_url = urljoin(url, href)
+                    # Links relativos são resolvidos contra a URL final (depois dos redirects)
+                    page_url = fetcher.final_url(url)
+                    soup = html_parse.parse(html, html_parse.LINKS)
+                    event_folder = event_folder_for(page_url, base_dir)
+
+                    for link in soup.find_all("a", href=True):
+                        href = link["href"]
+                        full_url = urljoin(page_url, href)
+
+                        if href.lower().endswith(".pdf"):
+                            pdfs.setdefault(full_url, os.path.join(event_folder, href.split("/")[-1]))
+                        elif in_scope(full_url) and depth < MAX_DEPTH:
+                            frontier.push(full_url, depth + 1, url_priority(full_url))
+                finally:
+                    frontier.done(url)
+
+                visited += 1
+                if visited % CHECKPOINT_EVERY == 0:
+                    frontier.save(checkpoint, {"pdfs": pdfs})
+                    print(f"{visited} pages crawled, {len(frontier)} queued, {len(pdfs)} PDFs found")
+
+        tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return visited
 
-        if href.lower().endswith(".pdf"):
-            filename = href.split("/")[-1]
-            save_path = os.path.join(event_folder, filename)
-            download_pdf(full_url, save_path)
-        elif BASE_URL in full_url and full_url not in visited:
-            # Recursively visit links within the base URL
-            find_pdfs_and_links(full_url, visited, base_dir)
 
 def main():
-    """Main script to start crawling."""
+    """Main script to start (or resume) crawling."""
     base_dir = "devopsdays_presentations"
     os.makedirs(base_dir, exist_ok=True)
-    visited_links = set()
-    find_pdfs_and_links(BASE_URL, visited_links, base_dir)
+
+    # --novo ignores an existing checkpoint; --bloom dedups with a Bloom filter for very large crawls
+    if os.path.isfile(CHECKPOINT_FILE) and "--novo" not in sys.argv:
+        frontier, extra = Frontier.load(CHECKPOINT_FILE)
+        pdfs = extra.get("pdfs", {})
+        print(f"Resuming crawl: {len(frontier)} pages queued, {len(pdfs)} PDFs found so far")
+    else:
+        frontier = Frontier(BloomFilter() if "--bloom" in sys.argv else None)
+        frontier.push(BASE_URL, 0, DEFAULT_PRIORITY)
+        pdfs = {}
+
+    try:
+        asyncio.run(crawl(frontier, pdfs, base_dir))
+    except KeyboardInterrupt:
+        frontier.save(CHECKPOINT_FILE, {"pdfs": pdfs})
+        print(f"\nCrawl interrupted; checkpoint saved to {CHECKPOINT_FILE}")
+        return
+    except Exception:
+        # Network or parsing errors also keep the crawl resumable
+        frontier.save(CHECKPOINT_FILE, {"pdfs": pdfs})
+        print(f"\nCrawl failed; checkpoint saved to {CHECKPOINT_FILE}")
+        raise
+
+    frontier.save(CHECKPOINT_FILE, {"pdfs": pdfs})
+
+    for save_path in set(pdfs.values()):
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    downloader.download_all(
+        [(url, path) for url, path in pdfs.items()],
+        downloader.LEDGER_FILE,
+    )
+
+    os.remove(CHECKPOINT_FILE)
+
 
 if __name__ == "__main__":
     main()
@@ -1,45 +1,18 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
 import csv
 import os
-import re
-import time
+import sys
 from datetime import datetime
-import json
-from openai import OpenAI
+from http_client import fetch
+import html_parse
+from csv_sort import sort_csv_by_year
+import talks_journal
+import llm_extract
+import program_strategy
+import search_index
+from event_index import BASE_URL, LEGACY_BASE, load_events
 
-BASE_URL = "https://devopsdays.org"
-LEGACY_BASE = "https://legacy.devopsdays.org"
-EVENTS_URL = f"{BASE_URL}/events/"
 OUTPUT_CSV = "talks_program.csv"
-HEADERS = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64)"}
-
-COUNTRY_CACHE = {}
-
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-def sort_csv_by_year(output_csv):
-    if not os.path.isfile(output_csv):
-        print("CSV ainda não existe, nada para ordenar.")
-        return
-
-    rows = []
-    with open(output_csv, "r", encoding="utf-8") as csvfile:
-        reader = csv.reader(csvfile)
-        header = next(reader)
-        for row in reader:
-            rows.append(row)
-
-    rows.sort(key=lambda r: int(r[0]))
-
-    with open(output_csv, "w", encoding="utf-8", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(header)
-        writer.writerows(rows)
-
-    print("CSV ordenado por ano com sucesso!")
-
-
 
 def build_link(base, link):
     if not link:
@@ -48,16 +21,6 @@ def build_link(base, link):
     return url
 
 
-def fetch(url):
-    try:
-        resp = requests.get(url, headers=HEADERS, timeout=10)
-        if resp.status_code == 200:
-            return resp.text
-        return None
-    except:
-        return None
-
-
 def split_author_title(text):
     if " - " in text:
         return text.split(" - ", 1)
@@ -67,72 +30,9 @@ def split_author_title(text):
         return text.split(" – ", 1)
     return ("", text)
 
-def extract_year(text: str) -> str:
-    match = re.search(r"\b(20\d{2}|19\d{2})\b", text)
-    return match.group(1) if match else text.strip()
-
-
-def extract_city(event_name: str) -> str:
-    name = re.sub(r"\s+", " ", event_name).strip()
-
-    if " - " in name:
-        name = name.split(" - ")[0].strip()
-
-    if ":" in name:
-        parts = name.split(":")
-        name = parts[-1].strip()
-
-    name = re.sub(r"\(.*?\)", "", name).strip()
-
-    name = re.sub(r"\d+", "", name).strip()
-
-    name = re.sub(r"\s+", " ", name)
-
-    return name
-
-
-def get_country(city):
-    city_key = city.lower().strip()
-
-    if city_key in COUNTRY_CACHE:
-        return COUNTRY_CACHE[city_key]
-
-    country = "Unknown"
-
-    try:
-        r = requests.get(
-            "https://geocoding-api.open-meteo.com/v1/search",
-            params={
-                "name": city,
-                "count": 1,
-                "language": "en",
-                "format": "json",
-            },
-            timeout=10,
-        )
-
-        if r.status_code != 200:
-            COUNTRY_CACHE[city_key] = "Unknown"
-            return "Unknown"
-
-        data = r.json()
-
-        results = data.get("results", [])
-        if not results:
-            COUNTRY_CACHE[city_key] = "Unknown"
-            return "Unknown"
-
-        country = results[0].get("country", "Unknown")
-
-    except:
-        country = "Unknown"
-
-    COUNTRY_CACHE[city_key] = country
-    return country
-
-
-def parse_legacy_complex(html, year, event_name, program_url):
-    soup = BeautifulSoup(html, "html.parser")
+def parse_legacy_complex(html, year, event_name, program_url, soup=None):
+    if soup is None:
+        soup = html_parse.parse(html)
     talks = []
 
     for box in soup.find_all("div", class_="span-6"):
@@ -168,11 +68,34 @@ def parse_legacy_program(url, year, event_name):
     if not html:
         return []
 
-    soup = BeautifulSoup(html, "html.parser")
+    return parse_legacy_html(html, url, year, event_name)
+
+
+def parse_legacy_html(html, url, year, event_name):
+    soup = html_parse.parse(html)
 
+    # Reaproveita a mesma árvore no layout complexo em vez de parsear de novo
     if soup.find("div", class_="span-6"):
-        return parse_legacy_complex(html, year, event_name, url)
+        return parse_legacy_complex(html, year, event_name, url, soup)
+
+    return parse_legacy_links(soup, url, year, event_name)
+
+
+def parse_legacy_complex_html(html, url, year, event_name):
+    soup = html_parse.parse(html)
+    if not soup.find("div", class_="span-6"):
+        return []
+    return parse_legacy_complex(html, year, event_name, url, soup)
+
+
+def parse_legacy_links_html(html, url, year, event_name):
+    soup = html_parse.parse(html)
+    if soup.find("div", class_="span-6"):
+        return []
+    return parse_legacy_links(soup, url, year, event_name)
+
 
+def parse_legacy_links(soup, url, year, event_name):
     talks = []
 
     for a in soup.find_all("a"):
@@ -199,7 +122,11 @@ def parse_modern_program(url, year, event_name):
     if not html:
         return []
 
-    soup = BeautifulSoup(html, "html.parser")
+    return parse_modern_html(html, url, year, event_name)
+
+
+def parse_modern_html(html, url, year, event_name):
+    soup = html_parse.parse(html, html_parse.PROGRAM_TALKS)
     talks = []
 
     for div in soup.find_all("div", class_="program-talk"):
@@ -226,156 +153,283 @@ def parse_modern_program(url, year, event_name):
 
 
 def iter_events():
-    print("Buscando eventos em devopsdays.org...")
+    for ev in load_events():
+        yield {"year": ev["year"], "event": ev["label"], "url": ev["url"]}
 
-    html = fetch(EVENTS_URL)
+
+def extract_talks_with_chatgpt(program_url: str, year: str, event_name: str, html=None):
+    print("Extraindo via ChatGPT (fallback)...")
+
+    if html is None:
+        html = fetch(program_url)
     if not html:
         return []
 
-    soup = BeautifulSoup(html, "html.parser")
-    year = None
+    return [
+        {
+            "year": year,
+            "event": event_name,
+            "author": t.get("author") or "",
+            "title": t.get("title") or "",
+            "link": build_link(BASE_URL, t.get("link")),
+        }
+        for t in llm_extract.default_extractor().extract(html, program_url)
+    ]
 
-    for tag in soup.find_all(["h4", "a"]):
 
-        if tag.name == "h4" and "events-page-months" in tag.get("class", []):
-            year = extract_year(tag.get_text(strip=True))
+def should_process(year, event_name):
+    try:
+        year_int = int(year)
+        if year_int > datetime.now().year:
+            print(f"\nPulando evento futuro: {event_name} ({year})")
+            return False
+    except ValueError:
+        print(f"\nAno inválido para o evento: {event_name} ({year})")
+        return False
 
-        if tag.name == "a" and "events-page-event" in tag.get("class", []):
-            raw_event = tag.text.strip()
-            city = extract_city(raw_event)
-            country = get_country(city)
-            event_name = f"{city} - {country}"
+    return True
 
-            link = tag.get("href")
-            full_url = BASE_URL + link
 
+def legacy_program_url(event_url):
+    return event_url.replace(BASE_URL, LEGACY_BASE) + "/program"
 
-            yield {"year": year, "event": event_name, "url": full_url}
-            time.sleep(0.25)
 
+def write_talks(writer, talks):
+    for t in talks:
+        writer.writerow([
+            t.get("year"),
+            t.get("event"),
+            t.get("author"),
+            t.get("title"),
+            t.get("link"),
+        ])
 
-def extract_container_html(html: str) -> str:
-    try:
-        soup = BeautifulSoup(html, "html.parser")
-        container = soup.find("div", class_="container")
 
-        if container:
-            return str(container)
-        else:
-            return html
-    except:
-        return html
+def reuse_or_ask_chatgpt(previous, digest, legacy_url, year, event_name, html):
+    """Com o mesmo conteúdo de uma execução anterior, reaproveita as talks em vez de pagar o ChatGPT de novo."""
+    if previous and previous["hash"] == digest and previous["status"] == "done":
+        print("Conteúdo inalterado — reaproveitando talks do journal.")
+        return previous["talks"]
+    return extract_talks_with_chatgpt(legacy_url, year, event_name, html)
 
-def extract_talks_with_chatgpt(program_url: str, year: str, event_name: str):
-    print("Extraindo via ChatGPT (fallback)...")
 
-    html = fetch(program_url)
-    if not html:
-        return []
+def program_urls(ev):
+    return {
+        "modern": ev["url"].rstrip("/") + "/program",
+        "legacy": legacy_program_url(ev["url"]),
+    }
 
-    cleaned_html = extract_container_html(html)
-    cleaned_html = cleaned_html[:50000]
 
-    prompt = f"""
-Receba o HTML abaixo, procure qualquer programação de talks/palestras e retorne APENAS um JSON com:
+def pages_hash(pages):
+    """Hash das páginas baixadas; None quando nenhuma página de programa pôde ser obtida."""
+    if not any(pages.values()):
+        return None
+    return talks_journal.content_hash(pages[url] for url in sorted(pages))
 
-- "author"
-- "title"
-- "link" (se existir; pode ser null)
 
-NÃO ESCREVA NADA FORA DO JSON.
+def strategy_order(ev, strategies):
+    if strategies is None:
+        return program_strategy.DEFAULT_ORDER
+    return strategies.order(ev["url"], ev["year"])
 
-HTML PARA EXTRAÇÃO:
 
-{cleaned_html}
-"""
-    resp = client.chat.completions.create(
-        model="gpt-4.1-mini",
-        messages=[
-            {"role": "system", "content": "Você extrai dados estruturados de HTML e devolve somente JSON."},
-            {"role": "user", "content": prompt},
-        ],
-        temperature=0,
-        max_completion_tokens=1500,
-    )
+def apply_strategy(strategy, html, url, ev, previous, pages):
+    year = ev["year"]
+    event_name = ev["event"]
 
-    content = resp.choices[0].message.content.strip()
+    if strategy == "modern":
+        return parse_modern_html(html, url, year, event_name)
+    if strategy == "legacy_complex":
+        return parse_legacy_complex_html(html, url, year, event_name)
+    if strategy == "legacy":
+        return parse_legacy_links_html(html, url, year, event_name)
 
-    try:
-        data = json.loads(content)
-        return [
-            {
-                "year": year,
-                "event": event_name,
-                "author": t.get("author") or "",
-                "title": t.get("title") or "",
-                "link": build_link(BASE_URL, t.get("link")),
-            }
-            for t in data
-        ]
-    except Exception as e:
-        print("Erro ao interpretar JSON recebido do ChatGPT:", e)
-        print("Conteúdo bruto recebido:\n", content)
-        return []
+    print("Nenhum talk encontrado — tentando com ChatGPT…")
+    return reuse_or_ask_chatgpt(previous, pages_hash(pages), url, year, event_name, html)
 
 
-def main():
-    file_exists = os.path.isfile(OUTPUT_CSV)
+def extract_event(ev, previous=None, strategies=None):
+    """Extrai as talks de um evento; retorna (talks, hash das páginas usadas, estratégia que funcionou).
 
-    with open(OUTPUT_CSV, "a", encoding="utf-8", newline="") as csvfile:
-        writer = csv.writer(csvfile)
+    As estratégias são tentadas na ordem aprendida e cada página é baixada no máximo uma vez.
+    """
+    urls = program_urls(ev)
+    pages = {}
 
-        if not file_exists:
-            writer.writerow(["ano", "local", "autor", "titulo", "link"])
-
-        for ev in iter_events():
-            year = ev.get("year")
-            event_name = ev.get("event")
-            event_url = ev.get("url")
-
-            try:
-                year_int = int(year)
-                if year_int > datetime.now().year:
-                    print(f"\nPulando evento futuro: {event_name} ({year})")
-                    continue
-            except ValueError:
-                print(f"\nAno inválido para o evento: {event_name} ({year})")
-                continue
+    for strategy in strategy_order(ev, strategies):
+        url = urls[program_strategy.STRATEGY_PAGES[strategy]]
+        if url not in pages:
+            print(f"Testando {strategy}: {url}")
+            pages[url] = fetch(url)
+        if not pages[url]:
+            continue
+
+        talks = apply_strategy(strategy, pages[url], url, ev, previous, pages)
+        if talks:
+            return talks, pages_hash(pages), strategy
+
+    return [], pages_hash(pages), None
+
+
+def record_result(journal, ev, talks, digest, strategy=None, strategies=None):
+    if digest is None:
+        # Nenhuma página de programa veio: é falha (tenta de novo no próximo reinício), não evento vazio
+        print(f"Nenhuma página de programa obtida: {ev['event']} ({ev['year']})")
+        journal.record(ev, "failed", error="nenhuma página de programa obtida")
+        return
+
+    status = "done" if talks else "empty"
+    journal.record(ev, status, digest, talks)
+    if strategies is not None:
+        strategies.learn(ev["url"], ev["year"], strategy)
+
+    if talks:
+        print(f"{len(talks)} talks extraídas ({strategy}): {ev['event']} ({ev['year']})")
+    else:
+        print(f"Nenhum talk encontrado: {ev['event']} ({ev['year']})")
+
+
+def crawl_sync(events, journal, strategies=None):
+    for ev in events:
+        print(f"\nEvento: {ev['event']} ({ev['year']})")
+
+        try:
+            result = extract_event(ev, journal.get(ev["url"]), strategies)
+        except Exception as e:
+            print(f"Falha ao processar {ev['url']}: {e}")
+            journal.record(ev, "failed", error=str(e))
+            continue
+
+        record_result(journal, ev, *result, strategies)
+
+
+async def crawl_event(fetcher, ev, previous=None, strategies=None):
+    urls = program_urls(ev)
+    pages = {}
+
+    for strategy in strategy_order(ev, strategies):
+        url = urls[program_strategy.STRATEGY_PAGES[strategy]]
+        if url not in pages:
+            pages[url] = await fetcher.fetch(url)
+        if not pages[url]:
+            continue
+
+        if strategy == "llm":
+            talks = await asyncio.to_thread(apply_strategy, strategy, pages[url], url, ev, previous, pages)
+        else:
+            talks = apply_strategy(strategy, pages[url], url, ev, previous, pages)
+        if talks:
+            return talks, pages_hash(pages), strategy
+
+    return [], pages_hash(pages), None
 
-            print(f"\nEvento: {event_name} ({year})")
 
-            program_url = event_url.rstrip("/") + "/program"
-            print(f"Testando moderno: {program_url}")
+async def crawl_async(events, journal, strategies=None):
+    from async_fetch import AsyncFetcher
 
-            talks = parse_modern_program(program_url, year, event_name)
+    print(f"\n{len(events)} eventos para processar em paralelo.")
 
-            if not talks:
-                legacy_url = event_url.replace(BASE_URL, LEGACY_BASE) + "/program"
-                print(f"Fallback: testando legacy → {legacy_url}")
-                talks = parse_legacy_program(legacy_url, year, event_name)
+    async def run(fetcher, ev):
+        try:
+            return ev, await crawl_event(fetcher, ev, journal.get(ev["url"]), strategies), None
+        except Exception as e:
+            return ev, None, e
 
-            if not talks:
-                legacy_url = event_url.replace(BASE_URL, LEGACY_BASE) + "/program"
-                print("Nenhum talk encontrado — tentando com ChatGPT…")
-                talks = extract_talks_with_chatgpt(legacy_url, year, event_name)
+    async with AsyncFetcher() as fetcher:
+        tasks = [run(fetcher, ev) for ev in events]
 
-            if not talks:
-                print("Nenhum talk encontrado para este evento.\n")
+        # Cada evento vai para o journal assim que termina, não na ordem da lista
+        for next_done in asyncio.as_completed(tasks):
+            ev, result, error = await next_done
+            if error is not None:
+                print(f"Falha ao processar {ev['url']}: {error}")
+                journal.record(ev, "failed", error=str(error))
                 continue
 
-            for t in talks:
-                writer.writerow([
-                    t.get("year"),
-                    t.get("event"),
-                    t.get("author"),
-                    t.get("title"),
-                    t.get("link"),
-                ])
+            record_result(journal, ev, *result, strategies)
+
+
+def load_existing_rows(output_csv=OUTPUT_CSV):
+    """Linhas do CSV já gerado, agrupadas por (ano, local)."""
+    existing = {}
+    if not os.path.isfile(output_csv):
+        return existing
+
+    with open(output_csv, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if len(row) >= 2:
+                existing.setdefault((row[0], row[1]), []).append(row)
+    return existing
 
-            print(f"{len(talks)} talks extraídas.\n")
 
+def write_output(events, journal, output_csv=OUTPUT_CSV):
+    """Gera o CSV final a partir do journal: uma vez cada evento, na ordem do índice, sem duplicatas.
 
-    print("\nConcluído! Arquivo gerado:", OUTPUT_CSV)
+    Eventos sem entrada "done" no journal (que não é versionado e começa vazio)
+    mantêm as linhas que já estavam no CSV, assim como eventos fora do índice.
+    """
+    existing = load_existing_rows(output_csv)
+    tmp = output_csv + ".tmp"
+    rows = 0
+    with open(tmp, "w", encoding="utf-8", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["ano", "local", "autor", "titulo", "link"])
+
+        for ev in events:
+            entry = journal.get(ev["url"])
+            kept = existing.pop((str(ev["year"]), ev["event"]), [])
+            if entry and entry["status"] == "done":
+                write_talks(writer, entry["talks"])
+                rows += len(entry["talks"])
+            else:
+                writer.writerows(kept)
+                rows += len(kept)
+
+        for kept in existing.values():
+            writer.writerows(kept)
+            rows += len(kept)
+    os.replace(tmp, output_csv)
+    return rows
+
+
+def main():
+    # --revalidar reprocessa também eventos já concluídos (o ChatGPT só é chamado se o conteúdo mudou)
+    revalidate = "--revalidar" in sys.argv
+
+    events = [
+        ev for ev in iter_events()
+        if should_process(ev.get("year"), ev.get("event"))
+    ]
+
+    # Parser que funcionou por evento e host/ano: re-crawls vão direto à página certa
+    strategies = program_strategy.StrategyStore()
+
+    with talks_journal.Journal() as journal:
+        todo = [ev for ev in events if revalidate or not journal.is_complete(ev["url"])]
+        print(f"\n{len(todo)} eventos a processar ({len(events) - len(todo)} já concluídos no journal).")
+
+        try:
+            if "--async" in sys.argv:
+                asyncio.run(crawl_async(todo, journal, strategies))
+            else:
+                crawl_sync(todo, journal, strategies)
+        finally:
+            strategies.save()
+
+    journal.compact()
+    rows = write_output(events, journal)
+
+    print(f"\nConcluído! Arquivo gerado: {OUTPUT_CSV} ({rows} talks)")
+    print(llm_extract.default_extractor().summary())
+
+    # --indexar atualiza o índice de busca com os títulos das talks
+    if "--indexar" in sys.argv:
+        index = search_index.SearchIndex()
+        added, removed = index.sync_talks(OUTPUT_CSV)
+        index.close()
+        print(f"Índice de busca: {added} talks indexadas, {removed} removidas.")
 
     sort_csv_by_year(OUTPUT_CSV)
 
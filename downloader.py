@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import httpx
+
+import http_client
+
+WORKERS = 6
+CHUNK_SIZE = 256 * 1024
+LEDGER_FILE = "download_ledger.json"
+
+
+class Ledger:
+    """Registro por arquivo baixado: url, tamanho, ETag, Last-Modified e sha256.
+
+    Também guarda o validador (ETag ou Last-Modified) dos downloads parciais
+    (.part) para retomá-los com Range + If-Range.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.files = {}
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.files = json.load(f)
+
+    def get(self, key):
+        with self.lock:
+            return self.files.get(key)
+
+    def put(self, key, entry):
+        with self.lock:
+            self.files[key] = entry
+
+    def save(self):
+        with self.lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.files, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+
+
+def file_sha256(path, h=None):
+    h = h or hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    return h
+
+
+def remote_matches(resp, entry, path, local_size):
+    """Compara o HEAD com o que já temos: ETag quando os dois lados têm, senão o tamanho.
+
+    Se o servidor não manda nenhum dos dois, vale o registro do ledger: mesmo
+    tamanho, Last-Modified compatível e o sha256 do arquivo local igual ao gravado.
+    """
+    etag = resp.headers.get("ETag")
+    if etag and entry and entry.get("etag"):
+        return etag == entry["etag"]
+
+    length = resp.headers.get("Content-Length")
+    if length is not None and length.isdigit():
+        return int(length) == local_size
+
+    if not entry or entry.get("sha256") is None or entry.get("size") != local_size:
+        return False
+    last_modified = resp.headers.get("Last-Modified")
+    if last_modified and entry.get("last_modified") and last_modified != entry["last_modified"]:
+        return False
+    return file_sha256(path).hexdigest() == entry["sha256"]
+
+
+def range_start(resp):
+    """Primeiro byte em 'Content-Range: bytes <início>-<fim>/<total>' (resposta 206), ou None."""
+    value = resp.headers.get("Content-Range", "")
+    unit, _, rest = value.partition(" ")
+    start = rest.partition("-")[0]
+    return int(start) if unit == "bytes" and start.isdigit() else None
+
+
+def range_total(resp):
+    """Tamanho total informado em 'Content-Range: bytes */<total>' (resposta 416), ou None."""
+    total = resp.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+def validator_matches(resp, validator):
+    """Sem ETag/Last-Modified na resposta, vale só o tamanho; com eles, precisam bater com o do .part."""
+    current = {resp.headers.get("ETag"), resp.headers.get("Last-Modified")} - {None}
+    return not current or validator in current
+
+
+def finish_partial(url, save_path, ledger, entry, complete, resp):
+    """Resolve um 416: promove o .part já completo ou o descarta e baixa de novo do zero."""
+    key = os.path.normpath(save_path)
+    part = save_path + ".part"
+
+    if not complete:
+        print(f"Partial download of {url} does not match the server; restarting")
+        os.remove(part)
+        ledger.put(key, {**(entry or {}), "url": url, "partial_validator": None})
+        return download(url, save_path, ledger)
+
+    os.replace(part, save_path)
+    ledger.put(key, {
+        "url": url,
+        "size": os.path.getsize(save_path),
+        "etag": resp.headers.get("ETag") or (entry or {}).get("etag"),
+        "last_modified": resp.headers.get("Last-Modified") or (entry or {}).get("last_modified"),
+        "sha256": file_sha256(save_path).hexdigest(),
+    })
+    return "resumed"
+
+
+def download(url, save_path, ledger):
+    """Baixa um arquivo se ele ainda não estiver completo no disco.
+
+    Retorna "skipped", "downloaded", "resumed" ou "failed".
+    """
+    key = os.path.normpath(save_path)
+    entry = ledger.get(key)
+    part = save_path + ".part"
+
+    try:
+        if os.path.isfile(save_path):
+            local_size = os.path.getsize(save_path)
+            resp = http_client.head(url)
+            if resp.status_code == 200 and remote_matches(resp, entry, save_path, local_size):
+                if entry is None or entry.get("sha256") is None or entry.get("url") != url:
+                    # Arquivo antigo, baixado antes do registro: adota no ledger sem baixar de novo
+                    ledger.put(key, {
+                        "url": url,
+                        "size": local_size,
+                        "etag": resp.headers.get("ETag"),
+                        "last_modified": resp.headers.get("Last-Modified"),
+                        "sha256": file_sha256(save_path).hexdigest(),
+                    })
+                return "skipped"
+
+        headers = {}
+        offset = os.path.getsize(part) if os.path.isfile(part) else 0
+        validator = (entry or {}).get("partial_validator")
+        if offset and validator:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+
+        with http_client.stream(url, headers=headers) as resp:
+            if resp.status_code == 416 and offset:
+                # Range além do fim: o .part pode já estar completo, ou o arquivo remoto mudou
+                complete = range_total(resp) == offset and validator_matches(resp, validator)
+                resp.close()
+                return finish_partial(url, save_path, ledger, entry, complete, resp)
+
+            if resp.status_code == 206 and range_start(resp) != offset:
+                # Trecho que não começa no fim do .part: anexar corromperia o arquivo
+                resp.close()
+                return finish_partial(url, save_path, ledger, entry, False, resp)
+
+            if resp.status_code == 206:
+                mode, status = "ab", "resumed"
+                h = file_sha256(part)
+            elif resp.status_code == 200:
+                mode, status = "wb", "downloaded"
+                h = hashlib.sha256()
+            else:
+                print(f"Failed to download {url}: HTTP {resp.status_code}")
+                return "failed"
+
+            etag = resp.headers.get("ETag")
+            validator = etag or resp.headers.get("Last-Modified")
+            ledger.put(key, {**(entry or {}), "url": url, "partial_validator": validator})
+            if mode == "wb":
+                # Grava já o validador do .part novo: se o processo cair no meio, a retomada usa If-Range
+                ledger.save()
+
+            with open(part, mode) as file:
+                for chunk in resp.iter_bytes(chunk_size=CHUNK_SIZE):
+                    file.write(chunk)
+                    h.update(chunk)
+
+        os.replace(part, save_path)
+        ledger.put(key, {
+            "url": url,
+            "size": os.path.getsize(save_path),
+            "etag": etag,
+            "last_modified": resp.headers.get("Last-Modified"),
+            "sha256": h.hexdigest(),
+        })
+        return status
+
+    except (httpx.HTTPError, OSError) as e:
+        print(f"Failed to download {url}: {e}")
+        return "failed"
+
+
+def download_all(jobs, ledger_path=LEDGER_FILE, workers=WORKERS):
+    """Baixa [(url, caminho)] com um pool limitado de threads e grava o ledger no fim."""
+    ledger = Ledger(ledger_path)
+    totals = {}
+    # O mesmo arquivo linkado duas vezes não pode ter dois downloads escrevendo no mesmo .part
+    jobs = {os.path.normpath(path): (url, path) for url, path in jobs}.values()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(download, url, path, ledger): path for url, path in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            status = future.result()
+            totals[status] = totals.get(status, 0) + 1
+            if status in ("downloaded", "resumed"):
+                print(f"Downloaded: {futures[future]}")
+            if done % 50 == 0:
+                ledger.save()
+
+    ledger.save()
+    print(", ".join(f"{n} {status}" for status, n in sorted(totals.items())) or "Nothing to download")
+    return totals
@@ -0,0 +1,152 @@
+import json
+import os
+import re
+import time
+import unicodedata
+from urllib.parse import urljoin, urlparse
+
+import geocache
+import html_parse
+import http_client
+
+BASE_URL = "https://devopsdays.org"
+LEGACY_BASE = "https://legacy.devopsdays.org"
+EVENTS_URL = f"{BASE_URL}/events/"
+INDEX_FILE = "event_index.json"
+INDEX_VERSION = 3
+
+# Exceções à regra "Cidade-Qualificador": nomes com vírgula que já aparecem assim nos CSVs e em Past_Events
+CITY_ALIASES = {
+    "washington, d.c.": "Washington, D.C.",
+    "washington, dc": "Washington, D.C.",
+    "washington dc": "Washington, D.C.",
+    "washington d.c.": "Washington, D.C.",
+}
+
+
+def extract_year(text: str) -> str:
+    match = re.search(r"\b(20\d{2}|19\d{2})\b", text)
+    return match.group(1) if match else text.strip()
+
+
+def place_name(event_name: str) -> str:
+    """Nome do local sem ano, prefixos nem parênteses, mantendo o qualificador ("Birmingham, AL")."""
+    name = unicodedata.normalize("NFC", event_name)
+    name = re.sub(r"\s+", " ", name).strip()
+
+    if " - " in name:
+        name = name.split(" - ")[0].strip()
+
+    if ":" in name:
+        name = name.split(":")[-1].strip()
+
+    name = re.sub(r"\(.*?\)", "", name).strip()
+    name = re.sub(r"\d+", "", name).strip()
+
+    return re.sub(r"\s+", " ", name)
+
+
+def canonical_city(event_name: str) -> str:
+    name = place_name(event_name)
+
+    alias = CITY_ALIASES.get(name.casefold())
+    if alias:
+        return alias
+
+    # O qualificador (estado/país) faz parte da chave: "Birmingham, AL" e "Birmingham, UK"
+    # são eventos diferentes → "Birmingham-AL" e "Birmingham-UK"
+    if "," in name:
+        city, qualifier = (part.strip() for part in name.split(",", 1))
+        name = f"{city}-{qualifier}" if qualifier else city
+
+    name = name.replace("/", "-")
+
+    return re.sub(r"\s+", " ", name)
+
+
+def parse_events_page(html):
+    soup = html_parse.parse(html, html_parse.EVENT_LIST)
+
+    events = []
+    year = None
+    past = False
+
+    for tag in soup.find_all(["h2", "h4", "a"]):
+        if tag.name == "h2":
+            past = tag.get_text(strip=True) == "Past"
+
+        elif tag.name == "h4" and "events-page-months" in tag.get("class", []):
+            year = extract_year(tag.get_text(strip=True))
+
+        elif tag.name == "a" and "events-page-event" in tag.get("class", []):
+            href = tag.get("href")
+            if not year or not href:
+                continue
+
+            name = tag.get_text(strip=True)
+            url = urljoin(BASE_URL, href).rstrip("/")
+            legacy = urlparse(url).hostname == urlparse(LEGACY_BASE).hostname
+            modern_url = url.replace(LEGACY_BASE, BASE_URL)
+
+            events.append(
+                {
+                    "year": year,
+                    "slug": url.split("/")[-1],
+                    "name": name,
+                    "city": canonical_city(name),
+                    "place": place_name(name),
+                    "url": url,
+                    "program_url": modern_url + "/program",
+                    "legacy_program_url": modern_url.replace(BASE_URL, LEGACY_BASE) + "/program",
+                    "legacy": legacy,
+                    "past": past,
+                }
+            )
+
+    return events
+
+
+def build_index(path=INDEX_FILE):
+    print("Construindo índice de eventos a partir de devopsdays.org...")
+
+    html = http_client.fetch(EVENTS_URL)
+    if not html:
+        print("Erro ao acessar página de eventos.")
+        return []
+
+    events = parse_events_page(html)
+
+    # Geocodifica com o qualificador na forma original ("Birmingham, AL"), que os provedores entendem
+    countries = geocache.get_countries([ev["place"] for ev in events])
+    for ev in events:
+        ev["country"] = countries[ev["place"]]
+        ev["label"] = f"{ev['city']} - {ev['country']}"
+
+    index = {
+        "version": INDEX_VERSION,
+        "built_at": int(time.time()),
+        "source": EVENTS_URL,
+        "events": events,
+    }
+
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+    print(f"Índice salvo em {path} ({len(events)} eventos).")
+    return events
+
+
+def load_events(path=INDEX_FILE):
+    if os.path.isfile(path):
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION:
+            return index["events"]
+
+    return build_index(path)
+
+
+if __name__ == "__main__":
+    build_index()
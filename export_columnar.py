@@ -0,0 +1,229 @@
+"""Exporta os CSVs do projeto para Parquet particionado por ano (e Arrow IPC com --arrow).
+
+Tipos corretos (ano inteiro, booleanos, coordenadas float), colunas repetidas como
+evento/palavra em dictionary encoding e cidade/país separados do nome do evento,
+para o mapa e os notebooks filtrarem por ano/país sem parsear texto.
+
+Uso:
+    python export_columnar.py              # todos os datasets existentes
+    python export_columnar.py talks words_pdfs --arrow
+"""
+import csv
+import os
+import shutil
+import sys
+
+import word_store
+
+EXPORT_DIR = "export"
+BATCH_ROWS = 50_000
+
+# Tipos lógicos das colunas: int, float, bool, str e dict (string com dictionary encoding)
+DATASETS = {
+    "talks": ("talks_program.csv", {
+        "ano": "int", "local": "dict", "autor": "str", "titulo": "str", "link": "str",
+    }),
+    "events_check": ("events_check.csv", {
+        "Ano": "int", "Evento": "dict", "Link": "str", "haveSite": "bool", "haveProgram": "bool",
+        "haveVideo": "bool", "haveSlide": "bool", "considered": "bool",
+        "videoLink": "str", "slideLink": "str",
+    }),
+    "events": ("DevopsDaysEventos.csv", {
+        "Ano": "int", "Evento": "dict", "Link": "str", "haveSite": "bool", "haveProgram": "bool",
+        "haveVideo": "bool", "haveSlide": "bool", "considered": "bool",
+    }),
+    "words_pdfs": ("words_from_pdfs.csv", {"Ano": "int", "Evento": "dict", "Palavra": "dict"}),
+    "words_webpage": ("words_from_webpage.csv", {"Ano": "int", "Evento": "dict", "Palavra": "dict"}),
+    "tf_pdfs": (word_store.tf_path("words_from_pdfs.csv"), {
+        "Ano": "int", "Evento": "dict", "Palavra": "dict", "Contagem": "int",
+    }),
+    "tf_webpage": (word_store.tf_path("words_from_webpage.csv"), {
+        "Ano": "int", "Evento": "dict", "Palavra": "dict", "Contagem": "int",
+    }),
+    "coordinates": ("eventos_coordenadas.csv", {
+        "Evento": "dict", "Latitude": "float", "Longitude": "float", "Coordenadas": "str",
+    }),
+}
+
+# Colunas acrescentadas depois: CSVs gerados antes delas exportam a coluna como nula
+OPTIONAL_COLUMNS = {"videoLink", "slideLink"}
+YEAR_COLUMNS = ("ano", "Ano")
+EVENT_COLUMNS = ("local", "Evento")
+
+
+def arrow_type(kind):
+    import pyarrow as pa
+
+    return {
+        "int": pa.int32(),
+        "float": pa.float64(),
+        "bool": pa.bool_(),
+        "str": pa.string(),
+        "dict": pa.dictionary(pa.int32(), pa.string()),
+    }[kind]
+
+
+def convert(kind, value):
+    value = value.strip()
+    if value == "":
+        return None
+    if kind == "int":
+        return int(value)
+    if kind == "float":
+        return float(value)
+    if kind == "bool":
+        return value.lower() == "true"
+    return value
+
+
+def split_event(name):
+    """Separa "Ghent - Belgium" em ("Ghent", "Belgium"); sem país, (nome, None)."""
+    if not name:
+        return None, None
+    city, sep, country = name.rpartition(" - ")
+    if not sep:
+        return name, None
+    return city, country
+
+
+def output_columns(columns):
+    """Colunas de saída: as do CSV, com ano padronizado como 'ano' e cidade/país derivados do evento."""
+    out = {}
+    for name, kind in columns.items():
+        out["ano" if name in YEAR_COLUMNS else name] = kind
+        if name in EVENT_COLUMNS:
+            out["cidade"] = "dict"
+            out["pais"] = "dict"
+    return out
+
+
+def schema_for(columns):
+    import pyarrow as pa
+
+    return pa.schema([(name, arrow_type(kind)) for name, kind in output_columns(columns).items()])
+
+
+def read_batches(path, columns, schema, batch_rows=BATCH_ROWS):
+    """Lê o CSV em lotes de RecordBatch, sem carregar o arquivo inteiro."""
+    import pyarrow as pa
+
+    out = output_columns(columns)
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        missing = [name for name in columns if name not in reader.fieldnames and name not in OPTIONAL_COLUMNS]
+        if missing:
+            raise ValueError(f"{path}: colunas ausentes {missing}")
+
+        while True:
+            data = {name: [] for name in out}
+            for row in reader:
+                for name, kind in columns.items():
+                    value = convert(kind, row.get(name) or "")
+                    data["ano" if name in YEAR_COLUMNS else name].append(value)
+                    if name in EVENT_COLUMNS:
+                        city, country = split_event(value)
+                        data["cidade"].append(city)
+                        data["pais"].append(country)
+                if len(data[next(iter(out))]) >= batch_rows:
+                    break
+
+            if not data[next(iter(out))]:
+                return
+
+            arrays = []
+            for field in schema:
+                if pa.types.is_dictionary(field.type):
+                    arrays.append(pa.array(data[field.name], pa.string()).dictionary_encode())
+                else:
+                    arrays.append(pa.array(data[field.name], field.type))
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def export_parquet(name, path, columns, export_dir=EXPORT_DIR):
+    """Grava export/<nome>/ano=AAAA/*.parquet; datasets sem ano viram um único arquivo."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    schema = schema_for(columns)
+    target = os.path.join(export_dir, name)
+    tmp = target + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    batches = read_batches(path, columns, schema)
+    if "ano" in schema.names:
+        ds.write_dataset(
+            batches,
+            tmp,
+            schema=schema,
+            format="parquet",
+            partitioning=ds.partitioning(pa.schema([("ano", pa.int32())]), flavor="hive"),
+            basename_template="part-{i}.parquet",
+        )
+    else:
+        os.makedirs(tmp)
+        with pq.ParquetWriter(os.path.join(tmp, "part-0.parquet"), schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+
+    # Troca o diretório inteiro para não sobrar partição de um ano que saiu do CSV
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    return target
+
+
+def export_arrow(name, path, columns, export_dir=EXPORT_DIR):
+    """Grava export/<nome>.arrow (IPC sem compressão, pronto para memory-map), ordenado por ano."""
+    import pyarrow as pa
+
+    schema = schema_for(columns)
+    target = os.path.join(export_dir, name + ".arrow")
+    tmp = target + ".tmp"
+
+    # O formato de arquivo IPC aceita um único dicionário por coluna: unifica os dos lotes
+    table = pa.Table.from_batches(read_batches(path, columns, schema), schema=schema)
+    table = table.unify_dictionaries().combine_chunks()
+    if "ano" in schema.names:
+        table = table.sort_by("ano")
+
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        writer.write_table(table, max_chunksize=BATCH_ROWS)
+
+    os.replace(tmp, target)
+    return target
+
+
+def open_arrow(name, export_dir=EXPORT_DIR):
+    """Abre um .arrow exportado via memory map (sem copiar para a memória)."""
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(os.path.join(export_dir, name + ".arrow"))).read_all()
+
+
+def export_all(names=None, arrow=False, export_dir=EXPORT_DIR):
+    os.makedirs(export_dir, exist_ok=True)
+
+    for name in names or DATASETS:
+        path, columns = DATASETS[name]
+        if not os.path.isfile(path):
+            print(f"Pulando {name}: {path} não encontrado.")
+            continue
+
+        print(f"Exportando {path} → {export_parquet(name, path, columns, export_dir)}")
+        if arrow:
+            print(f"Exportando {path} → {export_arrow(name, path, columns, export_dir)}")
+
+
+def main():
+    names = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    unknown = [name for name in names if name not in DATASETS]
+    if unknown:
+        print(f"Datasets desconhecidos: {', '.join(unknown)} (disponíveis: {', '.join(DATASETS)})")
+        sys.exit(1)
+
+    export_all(names, arrow="--arrow" in sys.argv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+import csv
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+import http_client
+
+DB_FILE = os.getenv("GEOCACHE_DB", "geocache.sqlite")
+DEFAULT_PROVIDER = "open-meteo"
+
+# Intervalo mínimo entre chamadas reais a cada provedor (segundos)
+PROVIDER_DELAY = {
+    "open-meteo": 0.25,
+    "nominatim": 1.0,
+}
+
+# (arquivo, coluna com "Cidade - País")
+SEED_CSVS = [
+    ("events_check.csv", 1),
+    ("talks_program.csv", 1),
+]
+
+_local = threading.local()
+_throttle_lock = threading.Lock()
+_last_call = {}
+_nominatim = None
+
+
+def get_db():
+    db = getattr(_local, "db", None)
+    if db is None:
+        db = sqlite3.connect(DB_FILE, timeout=30)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS places (
+                key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                country TEXT,
+                lat REAL,
+                lon REAL,
+                provider TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        _local.db = db
+        if db.execute("SELECT 1 FROM places LIMIT 1").fetchone() is None:
+            seed_from_csvs()
+    return db
+
+
+def place_key(name):
+    name = unicodedata.normalize("NFC", name or "")
+    return re.sub(r"\s+", " ", name).strip().casefold()
+
+
+def throttle(provider):
+    delay = PROVIDER_DELAY.get(provider, 1.0)
+    with _throttle_lock:
+        wait = _last_call.get(provider, 0) + delay - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _last_call[provider] = time.monotonic()
+
+
+def query_open_meteo(name):
+    r = http_client.get(
+        "https://geocoding-api.open-meteo.com/v1/search",
+        params={"name": name, "count": 1, "language": "en", "format": "json"},
+    )
+    if r.status_code != 200:
+        raise httpx.HTTPStatusError(f"status {r.status_code}", request=r.request, response=r)
+
+    results = r.json().get("results") or []
+    if not results:
+        return {"country": "Unknown", "lat": None, "lon": None}
+
+    top = results[0]
+    return {
+        "country": top.get("country", "Unknown"),
+        "lat": top.get("latitude"),
+        "lon": top.get("longitude"),
+    }
+
+
+def query_nominatim(name):
+    global _nominatim
+    if _nominatim is None:
+        from geopy.geocoders import Nominatim
+        _nominatim = Nominatim(user_agent="geo_converter")
+
+    location = _nominatim.geocode(name, language="en", addressdetails=True)
+    if not location:
+        return {"country": "Unknown", "lat": None, "lon": None}
+
+    address = location.raw.get("address", {})
+    return {
+        "country": address.get("country", "Unknown"),
+        "lat": location.latitude,
+        "lon": location.longitude,
+    }
+
+
+PROVIDERS = {
+    "open-meteo": query_open_meteo,
+    "nominatim": query_nominatim,
+}
+
+
+def is_hit(row, need_coords):
+    if row is None:
+        return False
+    if need_coords and row["lat"] is None and row["provider"] == "seed":
+        return False
+    return True
+
+
+def resolve(name, provider):
+    throttle(provider)
+    try:
+        place = PROVIDERS[provider](name)
+    except Exception as e:
+        print(f"Erro ao geocodificar {name} ({provider}): {e}")
+        return None
+
+    place.update({"query": name, "provider": provider})
+    return place
+
+
+def save(places):
+    now = time.time()
+    db = get_db()
+    with db:
+        db.executemany(
+            "INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (place_key(p["query"]), p["query"], p["country"], p["lat"], p["lon"], p["provider"], now)
+                for p in places
+            ],
+        )
+
+
+def lookup_many(names, provider=DEFAULT_PROVIDER, need_coords=False, workers=1):
+    """Resolve vários nomes: deduplica, consulta o cache e só vai à rede para os que faltam.
+
+    Com workers > 1 as consultas que faltam rodam em paralelo; o throttle por
+    provedor continua valendo, então só a latência das respostas se sobrepõe.
+
+    Retorna {nome: lugar}; lugar é None quando a consulta falhou (não é gravado em cache).
+    """
+    keys = {}
+    for name in names:
+        keys.setdefault(place_key(name), name)
+
+    db = get_db()
+    found = {}
+    for key in keys:
+        row = db.execute("SELECT * FROM places WHERE key = ?", (key,)).fetchone()
+        if is_hit(row, need_coords):
+            found[key] = dict(row)
+
+    missing = [key for key in keys if key not in found]
+    if missing:
+        print(f"Geocodificando {len(missing)} locais via {provider} ({len(found)} em cache)...")
+
+    fresh = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = pool.map(lambda key: resolve(keys[key], provider), missing)
+        for key, place in zip(missing, results):
+            found[key] = place
+            if place is not None:
+                fresh.append(place)
+    if fresh:
+        save(fresh)
+
+    return {name: found[place_key(name)] for name in names}
+
+
+def lookup(name, provider=DEFAULT_PROVIDER, need_coords=False):
+    return lookup_many([name], provider, need_coords)[name]
+
+
+def get_countries(cities):
+    return {
+        city: place["country"] if place else "Unknown"
+        for city, place in lookup_many(cities).items()
+    }
+
+
+def get_country(city):
+    return get_countries([city])[city]
+
+
+def seed_from_csvs(sources=SEED_CSVS):
+    seeds = {}
+    for path, column in sources:
+        if not os.path.isfile(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if len(row) <= column or not row[0].isdigit() or " - " not in row[column]:
+                    continue
+                city, country = row[column].rsplit(" - ", 1)
+                if country.strip() and country.strip() != "Unknown":
+                    seeds.setdefault(place_key(city), (city.strip(), country.strip()))
+
+    now = time.time()
+    db = get_db()
+    with db:
+        before = db.total_changes
+        db.executemany(
+            "INSERT OR IGNORE INTO places VALUES (?, ?, ?, NULL, NULL, 'seed', ?)",
+            [(key, city, country, now) for key, (city, country) in seeds.items()],
+        )
+        added = db.total_changes - before
+
+    print(f"{added} locais semeados a partir dos CSVs ({len(seeds)} encontrados).")
+    return added
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        for name, place in lookup_many(sys.argv[1:]).items():
+            print(name, place)
+    else:
+        seed_from_csvs()
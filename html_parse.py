@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+# Recortes usados pelos scrapers: só essas tags (e o que está dentro delas) entram na árvore
+EVENT_LIST = SoupStrainer(["h2", "h4", "a"])
+LINKS = SoupStrainer("a", href=True)
+PROGRAM_TALKS = SoupStrainer("div", class_="program-talk")
+CONTAINER = SoupStrainer("div", class_="container")
+
+# Páginas de exemplo versionadas (lista de eventos e os layouts de programa) para o benchmark
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "html")
+
+
+def parse(html, only=None, parser=None):
+    """Monta a árvore com o parser mais rápido disponível (lxml quando instalado).
+
+    only recebe um SoupStrainer para construir só a parte do documento que interessa.
+    """
+    return BeautifulSoup(html, parser or PARSER, parse_only=only)
+
+
+def load_fixtures(folder):
+    pages = []
+    for root, _, files in os.walk(folder):
+        for file in sorted(files):
+            if file.endswith(".tmp"):
+                continue
+            with open(os.path.join(root, file), "r", encoding="utf-8", errors="replace") as f:
+                text = f.read()
+            if "<html" in text[:2048].lower():
+                pages.append(text)
+    return pages
+
+
+def benchmark(pages, repeat=3):
+    """Compara html.parser x lxml, documento inteiro x recorte, sobre as mesmas páginas."""
+    parsers = ["html.parser"] + (["lxml"] if PARSER == "lxml" else [])
+    strainers = {
+        "documento inteiro": None,
+        "lista de eventos": EVENT_LIST,
+        "links": LINKS,
+        "talks do programa": PROGRAM_TALKS,
+    }
+
+    print(f"{len(pages)} páginas, {sum(map(len, pages))} caracteres")
+    for parser in parsers:
+        for name, only in strainers.items():
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                for page in pages:
+                    parse(page, only, parser)
+                best = min(best, time.perf_counter() - start)
+            print(f"{parser:12s} {name:20s} {best * 1000:8.1f} ms  {len(pages) / best:8.1f} páginas/s")
+
+
+if __name__ == "__main__":
+    # python html_parse.py [pasta]  → benchmark sobre as páginas de fixtures/html
+    # (passe .http_cache/bodies para medir sobre as páginas salvas no cache HTTP)
+    benchmark(load_fixtures(sys.argv[1] if len(sys.argv) > 1 else FIXTURES_DIR))
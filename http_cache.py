@@ -0,0 +1,180 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_DIR = os.getenv("HTTP_CACHE_DIR", ".http_cache")
+CACHE_ENABLED = os.getenv("HTTP_CACHE", "1") != "0"
+TTL = int(os.getenv("HTTP_CACHE_TTL", 24 * 3600))
+MAX_SIZE = int(os.getenv("HTTP_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# Respostas negativas também ficam em cache para não repetir 404 a cada execução
+CACHEABLE_STATUSES = {200, 404, 410}
+
+_local = threading.local()
+
+
+def get_db():
+    db = getattr(_local, "db", None)
+    if db is None:
+        os.makedirs(os.path.join(CACHE_DIR, "bodies"), exist_ok=True)
+        db = sqlite3.connect(os.path.join(CACHE_DIR, "index.sqlite"), timeout=30)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                body_hash TEXT,
+                size INTEGER NOT NULL DEFAULT 0,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                final_url TEXT
+            )
+            """
+        )
+        # Caches criados antes da coluna final_url (URL depois dos redirects)
+        if "final_url" not in {row[1] for row in db.execute("PRAGMA table_info(entries)")}:
+            db.execute("ALTER TABLE entries ADD COLUMN final_url TEXT")
+        db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at)")
+        _local.db = db
+    return db
+
+
+def body_path(body_hash):
+    return os.path.join(CACHE_DIR, "bodies", body_hash[:2], body_hash)
+
+
+def lookup(url):
+    if not CACHE_ENABLED:
+        return None
+    return get_db().execute("SELECT * FROM entries WHERE url = ?", (url,)).fetchone()
+
+
+def is_fresh(entry, ttl=None):
+    ttl = TTL if ttl is None else ttl
+    return entry is not None and time.time() - entry["fetched_at"] < ttl
+
+
+def read_body(entry):
+    if entry["status"] != 200:
+        return None
+    try:
+        with open(body_path(entry["body_hash"]), "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def touch(url, refreshed=False):
+    now = time.time()
+    db = get_db()
+    if refreshed:
+        db.execute("UPDATE entries SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+    else:
+        db.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (now, url))
+    db.commit()
+
+
+def store(url, status, text=None, etag=None, last_modified=None, final_url=None):
+    if not CACHE_ENABLED or status not in CACHEABLE_STATUSES:
+        return
+
+    body_hash, size = None, 0
+    if status == 200:
+        data = text.encode("utf-8")
+        body_hash = hashlib.sha256(data).hexdigest()
+        size = len(data)
+        path = body_path(body_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+    now = time.time()
+    db = get_db()
+    db.execute(
+        "INSERT OR REPLACE INTO entries "
+        "(url, status, body_hash, size, etag, last_modified, fetched_at, accessed_at, final_url) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (url, status, body_hash, size, etag, last_modified, now, now, final_url),
+    )
+    db.commit()
+    evict()
+
+
+def evict(max_size=None):
+    max_size = MAX_SIZE if max_size is None else max_size
+    db = get_db()
+
+    total = db.execute(
+        "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT body_hash, size FROM entries)"
+    ).fetchone()[0]
+    if total <= max_size:
+        return
+
+    for row in db.execute("SELECT url, body_hash, size FROM entries ORDER BY accessed_at").fetchall():
+        if total <= max_size:
+            break
+        db.execute("DELETE FROM entries WHERE url = ?", (row["url"],))
+        if row["body_hash"] is None:
+            continue
+        shared = db.execute(
+            "SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (row["body_hash"],)
+        ).fetchone()
+        if shared is None:
+            total -= row["size"]
+            try:
+                os.remove(body_path(row["body_hash"]))
+            except OSError:
+                pass
+    db.commit()
+
+
+def cached_text(url):
+    """Retorna (entrada, hit, texto); hit indica que a entrada ainda está no TTL."""
+    entry = lookup(url)
+    if is_fresh(entry):
+        text = read_body(entry)
+        if text is not None or entry["status"] != 200:
+            touch(url)
+            return entry, True, text
+    return entry, False, None
+
+
+def conditional_headers(entry):
+    headers = {}
+    if entry is None or entry["status"] != 200:
+        return headers
+    if not os.path.exists(body_path(entry["body_hash"])):
+        return headers
+    if entry["etag"]:
+        headers["If-None-Match"] = entry["etag"]
+    if entry["last_modified"]:
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def resolve(url, entry, resp):
+    """Interpreta a resposta da rede (incluindo 304) e atualiza o cache."""
+    if resp.status_code == 304 and entry is not None:
+        text = read_body(entry)
+        if text is not None:
+            touch(url, refreshed=True)
+            return text
+
+    if resp.status_code == 200:
+        text = resp.text
+        final_url = str(resp.url)
+        store(url, 200, text, resp.headers.get("ETag"), resp.headers.get("Last-Modified"),
+              final_url if final_url != url else None)
+        return text
+
+    store(url, resp.status_code)
+    return None
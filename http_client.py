@@ -0,0 +1,130 @@
+import random
+import time
+from contextlib import contextmanager
+
+import httpx
+
+import http_cache
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64)"}
+TIMEOUT = httpx.Timeout(10, connect=5)
+LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30)
+
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+try:
+    import brotli  # noqa: F401
+    HEADERS["Accept-Encoding"] = "gzip, deflate, br"
+except ImportError:
+    HEADERS["Accept-Encoding"] = "gzip, deflate"
+
+_client = None
+
+
+def client_options():
+    return {
+        "headers": HEADERS,
+        "timeout": TIMEOUT,
+        "limits": LIMITS,
+        "http2": HTTP2,
+        "follow_redirects": True,
+    }
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = httpx.Client(**client_options())
+    return _client
+
+
+def close():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def backoff_delay(attempt, resp=None):
+    if resp is not None:
+        retry_after = resp.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(BACKOFF_MAX, int(retry_after))
+
+    delay = BACKOFF_BASE * (2 ** attempt)
+    return min(BACKOFF_MAX, delay + random.uniform(0, delay / 2))
+
+
+def request(method, url, **kwargs):
+    """Requisição com keep-alive e retry exponencial em 429/5xx e falhas de rede."""
+    client = get_client()
+
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            resp = client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        if resp.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+            time.sleep(backoff_delay(attempt, resp))
+            continue
+
+        return resp
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def head(url, **kwargs):
+    return request("HEAD", url, **kwargs)
+
+
+def fetch(url):
+    entry, hit, text = http_cache.cached_text(url)
+    if hit:
+        return text
+
+    try:
+        resp = get(url, headers=http_cache.conditional_headers(entry))
+    except httpx.HTTPError:
+        return None
+
+    return http_cache.resolve(url, entry, resp)
+
+
+@contextmanager
+def stream(url, **kwargs):
+    client = get_client()
+
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            resp = client.send(client.build_request("GET", url, **kwargs), stream=True)
+        except httpx.TransportError:
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        if resp.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+            resp.close()
+            time.sleep(backoff_delay(attempt, resp))
+            continue
+
+        try:
+            yield resp
+        finally:
+            resp.close()
+        return
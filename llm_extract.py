@@ -0,0 +1,294 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import html_parse
+
+MODEL = os.getenv("LLM_MODEL", "gpt-4.1-mini")
+PROMPT_VERSION = 2
+CACHE_DB = os.getenv("LLM_CACHE_DB", "llm_cache.sqlite")
+METRICS_FILE = "llm_metrics.jsonl"
+
+MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", 4))
+MAX_INPUT_CHARS = 20000
+MAX_COMPLETION_TOKENS = 1500
+
+# Orçamento por execução; 0 desliga o limite
+TOKEN_BUDGET = int(os.getenv("LLM_TOKEN_BUDGET", 300_000))
+COST_BUDGET = float(os.getenv("LLM_COST_BUDGET", 1.0))
+# US$ por 1M de tokens (entrada, saída)
+PRICES = {"gpt-4.1-mini": (0.40, 1.60)}
+
+SYSTEM_PROMPT = "Você extrai dados estruturados de páginas de programação e devolve somente JSON."
+
+PROMPT = """
+Abaixo está o conteúdo de uma página de programação de evento, uma linha por trecho.
+Links aparecem como "texto <url>". Procure a programação de talks/palestras e retorne
+APENAS uma lista JSON de objetos com:
+
+- "author"
+- "title"
+- "link" (se existir; pode ser null)
+
+NÃO ESCREVA NADA FORA DO JSON.
+
+CONTEÚDO:
+
+{content}
+"""
+
+_local = threading.local()
+_client = None
+
+
+def get_client():
+    """Cliente OpenAI criado só quando o fallback é usado.
+
+    OPENAI_BASE_URL aponta para qualquer endpoint compatível (ex.: o stub local de llm_stub.py).
+    """
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
+
+
+def boil_html(html, max_chars=MAX_INPUT_CHARS):
+    """Reduz o HTML a linhas de texto e pares texto/link, sem marcação, scripts ou estilos."""
+    root = html_parse.parse(html, html_parse.CONTAINER).find("div", class_="container")
+    if root is None:
+        soup = html_parse.parse(html)
+        root = soup.body or soup
+
+    for tag in root(["script", "style", "noscript", "svg", "nav", "footer"]):
+        tag.decompose()
+
+    for a in root.find_all("a"):
+        text = a.get_text(" ", strip=True)
+        href = a.get("href") or ""
+        a.replace_with(f"\n{text} <{href}>\n" if href and not href.startswith("#") else f"\n{text}\n")
+
+    lines = []
+    for line in root.get_text("\n", strip=True).splitlines():
+        line = " ".join(line.split())
+        if line and (not lines or lines[-1] != line):
+            lines.append(line)
+
+    return "\n".join(lines)[:max_chars]
+
+
+def cache_key(content, model=MODEL):
+    return hashlib.sha256(f"{model}\0{PROMPT_VERSION}\0{content}".encode("utf-8")).hexdigest()
+
+
+def get_db():
+    db = getattr(_local, "db", None)
+    if db is None:
+        db = sqlite3.connect(CACHE_DB, timeout=30)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                content TEXT NOT NULL,
+                prompt_tokens INTEGER,
+                completion_tokens INTEGER,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        _local.db = db
+    return db
+
+
+def cost(model, prompt_tokens, completion_tokens):
+    price_in, price_out = PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+
+def parse_talks(text):
+    """Interpreta a resposta do modelo como lista JSON; None quando não é JSON válido (ex.: truncada)."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+    return [t for t in data if isinstance(t, dict)] if isinstance(data, list) else []
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class LLMExtractor:
+    """Fallback de extração via LLM com cache persistente, concorrência limitada e orçamento.
+
+    Seguro para uso a partir de várias threads (o modo --async chama via asyncio.to_thread).
+    """
+
+    def __init__(self, model=MODEL, max_in_flight=MAX_IN_FLIGHT, token_budget=TOKEN_BUDGET,
+                 cost_budget=COST_BUDGET, metrics_file=METRICS_FILE):
+        self.model = model
+        self.slots = threading.BoundedSemaphore(max_in_flight)
+        self.lock = threading.Lock()
+        self.token_budget = token_budget
+        self.cost_budget = cost_budget
+        self.metrics_file = metrics_file
+        self.tokens_used = 0
+        self.tokens_reserved = 0
+        self.cost_reserved = 0.0
+        self.cost_used = 0.0
+        self.metrics = []
+
+    def estimate_cost(self, estimate):
+        """Custo máximo de uma reserva: o prompt estimado mais a resposta no limite de tokens."""
+        return cost(self.model, estimate - MAX_COMPLETION_TOKENS, MAX_COMPLETION_TOKENS)
+
+    def reserve(self, content):
+        """Reserva uma estimativa de tokens antes da chamada, para chamadas paralelas não estourarem o orçamento.
+
+        Tokens e custo contam o que já foi gasto e o que está reservado por chamadas em andamento.
+        """
+        estimate = (len(SYSTEM_PROMPT) + len(PROMPT) + len(content)) // 4 + MAX_COMPLETION_TOKENS
+        estimate_cost = self.estimate_cost(estimate)
+        with self.lock:
+            committed = self.tokens_used + self.tokens_reserved
+            if self.token_budget and committed + estimate > self.token_budget:
+                raise BudgetExceeded(f"orçamento de {self.token_budget} tokens esgotado")
+            committed_cost = self.cost_used + self.cost_reserved
+            if self.cost_budget and committed_cost + estimate_cost > self.cost_budget:
+                raise BudgetExceeded(f"orçamento de US$ {self.cost_budget:.2f} esgotado")
+            self.tokens_reserved += estimate
+            self.cost_reserved += estimate_cost
+        return estimate
+
+    def release(self, reserved):
+        """Devolve uma reserva (chamada concluída ou que falhou). Chamar com self.lock tomado."""
+        if reserved:
+            self.tokens_reserved -= reserved
+            self.cost_reserved = max(0.0, self.cost_reserved - self.estimate_cost(reserved))
+
+    def record(self, url, latency, prompt_tokens, completion_tokens, cached, reserved=0):
+        metric = {
+            "url": url,
+            "model": self.model,
+            "cached": cached,
+            "latency_ms": round(latency * 1000, 1),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost_usd": 0.0 if cached else round(cost(self.model, prompt_tokens, completion_tokens), 6),
+            "at": int(time.time()),
+        }
+        with self.lock:
+            self.release(reserved)
+            if not cached:
+                self.tokens_used += prompt_tokens + completion_tokens
+                self.cost_used += metric["cost_usd"]
+            self.metrics.append(metric)
+            if self.metrics_file:
+                with open(self.metrics_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(metric) + "\n")
+
+    def complete(self, content, url=""):
+        """Devolve o texto da resposta do modelo, do cache quando possível.
+
+        Só respostas que são JSON válido vão para o cache (e só elas são servidas dele):
+        uma resposta truncada é refeita na próxima vez em vez de ficar presa no cache.
+        """
+        key = cache_key(content, self.model)
+        start = time.perf_counter()
+
+        row = get_db().execute("SELECT * FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None and parse_talks(row["content"]) is not None:
+            self.record(url, time.perf_counter() - start, row["prompt_tokens"] or 0,
+                        row["completion_tokens"] or 0, cached=True)
+            return row["content"]
+
+        reserved = self.reserve(content)
+        try:
+            with self.slots:
+                start = time.perf_counter()
+                resp = get_client().chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": PROMPT.format(content=content)},
+                    ],
+                    temperature=0,
+                    max_completion_tokens=MAX_COMPLETION_TOKENS,
+                )
+                latency = time.perf_counter() - start
+        except BaseException:
+            with self.lock:
+                self.release(reserved)
+            raise
+
+        text = (resp.choices[0].message.content or "").strip()
+        usage = resp.usage
+        prompt_tokens = usage.prompt_tokens if usage else 0
+        completion_tokens = usage.completion_tokens if usage else 0
+        self.record(url, latency, prompt_tokens, completion_tokens, cached=False, reserved=reserved)
+
+        if parse_talks(text) is not None:
+            db = get_db()
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, self.model, text, prompt_tokens, completion_tokens, time.time()),
+                )
+        return text
+
+    def extract(self, html, url=""):
+        """Extrai [{author, title, link}] de uma página; [] se o orçamento acabou ou a resposta não é JSON."""
+        content = boil_html(html)
+        if not content:
+            return []
+
+        try:
+            text = self.complete(content, url)
+        except BudgetExceeded as e:
+            print(f"LLM pulado para {url}: {e}")
+            return []
+
+        talks = parse_talks(text)
+        if talks is None:
+            print("Erro ao interpretar JSON recebido do LLM (resposta não vai para o cache).")
+            print("Conteúdo bruto recebido:\n", text)
+            return []
+        return talks
+
+    def summary(self):
+        with self.lock:
+            calls = [m for m in self.metrics if not m["cached"]]
+            hits = len(self.metrics) - len(calls)
+            latencies = sorted(m["latency_ms"] for m in calls)
+
+        if not self.metrics:
+            return "LLM: nenhuma chamada."
+
+        p50 = latencies[len(latencies) // 2] if latencies else 0
+        return (
+            f"LLM: {len(calls)} chamadas, {hits} do cache, {self.tokens_used} tokens, "
+            f"US$ {self.cost_used:.4f}, latência p50 {p50:.0f} ms"
+        )
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_extractor():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = LLMExtractor()
+    return _default
@@ -0,0 +1,65 @@
+"""Servidor local compatível com /v1/chat/completions para testar o fallback sem gastar tokens.
+
+Uso:
+    python llm_stub.py 8765 &
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub python devopsdaysthemes.py
+
+Responde com uma talk por link "texto <url>" encontrado no conteúdo enviado.
+"""
+import json
+import re
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LINK_RE = re.compile(r"^(.+?) <(\S+)>$", re.M)
+LATENCY = 0.2
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        prompt = "".join(m["content"] for m in body["messages"])
+        talks = [
+            {"author": "", "title": text, "link": link}
+            for text, link in LINK_RE.findall(prompt)
+            if "/talks/" in link or "/program/" in link
+        ]
+        content = json.dumps(talks, ensure_ascii=False)
+        time.sleep(LATENCY)
+
+        reply = json.dumps({
+            "id": "stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": (len(prompt) + len(content)) // 4,
+            },
+        }).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    print(f"Stub LLM em http://127.0.0.1:{port}/v1")
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
@@ -0,0 +1,240 @@
+"""GeoJSON pré-agregado para o mapa: eventos por ano, acumulado e clusters por zoom.
+
+Lê o banco do analytics_store (atualizado de forma incremental antes da
+exportação) e as coordenadas do geocache. Gera em map/:
+
+    <ano>.geojson             um ponto por evento do ano
+    acumulado_<ano>.geojson   todos os eventos até o ano
+    clusters_z<zoom>.geojson  clusters em grade por zoom (ano a ano e "all")
+    index.json                anos, zooms e arquivos gerados
+"""
+import json
+import math
+import os
+from collections import defaultdict
+
+import analytics_store
+import event_index
+import geocache
+
+MAP_DIR = "map"
+PROVIDER = "nominatim"
+TOP_TERMS = 5
+ZOOM_LEVELS = (2, 4, 6)
+# Lado da célula de agrupamento, em pixels de tela no zoom do cluster
+CLUSTER_PX = 60
+TILE_SIZE = 256
+
+
+def event_rows(db):
+    """Eventos vindos do events_check.csv (os únicos com link e flags de mídia)."""
+    return db.execute(
+        """
+        SELECT id, year, name, city, country, link, have_site, have_program, have_video,
+               have_slide, considered, video_link, slide_link
+        FROM events
+        WHERE link IS NOT NULL
+        ORDER BY year, name
+        """
+    ).fetchall()
+
+
+def talk_counts(db):
+    return dict(db.execute("SELECT event_id, COUNT(*) FROM talks GROUP BY event_id").fetchall())
+
+
+def top_terms(db, n=TOP_TERMS):
+    """Termos mais frequentes de cada evento (PDFs e páginas somados) numa única consulta."""
+    rows = db.execute(
+        """
+        SELECT event_id, term FROM (
+            SELECT c.event_id, t.term,
+                   ROW_NUMBER() OVER (PARTITION BY c.event_id ORDER BY SUM(c.count) DESC, t.term) AS rank
+            FROM term_counts c
+            JOIN terms t ON t.id = c.term_id
+            GROUP BY c.event_id, c.term_id
+        )
+        WHERE rank <= ?
+        ORDER BY event_id, rank
+        """,
+        (n,),
+    )
+    terms = defaultdict(list)
+    for event_id, term in rows:
+        terms[event_id].append(term)
+    return terms
+
+
+def event_places(events):
+    """Nome a geocodificar de cada evento (por id).
+
+    O rótulo "Cidade - País" não distingue homônimos ("Birmingham, AL" e
+    "Birmingham, UK"); o índice de eventos guarda o local com o qualificador.
+    Eventos fora do índice usam o próprio rótulo.
+    """
+    indexed = {}
+    if os.path.isfile(event_index.INDEX_FILE):
+        indexed = {(int(ev["year"]), ev["label"]): ev["place"] for ev in event_index.load_events()}
+    return {ev["id"]: indexed.get((ev["year"], ev["name"])) or ev["name"] for ev in events}
+
+
+def flag(value):
+    return None if value is None else bool(value)
+
+
+def build_features(db, provider=PROVIDER):
+    events = event_rows(db)
+    queries = event_places(events)
+    places = geocache.lookup_many(list(queries.values()), provider=provider, need_coords=True)
+    talks = talk_counts(db)
+    terms = top_terms(db)
+
+    features = []
+    missing = 0
+    for ev in events:
+        place = places.get(queries[ev["id"]])
+        if not place or place["lat"] is None:
+            missing += 1
+            continue
+
+        features.append({
+            "type": "Feature",
+            "id": f"{ev['year']}/{ev['id']}",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [round(place["lon"], 5), round(place["lat"], 5)],
+            },
+            "properties": {
+                "year": ev["year"],
+                "name": ev["name"],
+                "city": ev["city"],
+                "country": ev["country"],
+                "link": ev["link"],
+                "talks": talks.get(ev["id"], 0),
+                "top_terms": terms.get(ev["id"], []),
+                "has_site": flag(ev["have_site"]),
+                "has_program": flag(ev["have_program"]),
+                "has_video": flag(ev["have_video"]),
+                "has_slides": flag(ev["have_slide"]),
+                "considered": flag(ev["considered"]),
+                "video_link": ev["video_link"],
+                "slide_link": ev["slide_link"],
+            },
+        })
+
+    if missing:
+        print(f"{missing} eventos sem coordenadas ficaram fora do mapa.")
+    return features
+
+
+def feature_collection(features, **meta):
+    return {"type": "FeatureCollection", **meta, "features": features}
+
+
+def world_pixel(lon, lat, zoom):
+    """Coordenada em pixels de tela (Web Mercator) no zoom dado."""
+    scale = TILE_SIZE * (1 << zoom)
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    sin = math.sin(math.radians(lat))
+    x = (lon + 180) / 360 * scale
+    y = (0.5 - math.log((1 + sin) / (1 - sin)) / (4 * math.pi)) * scale
+    return x, y
+
+
+def cluster(features, zoom, cell_px=CLUSTER_PX):
+    """Agrupa pontos numa grade de cell_px pixels no zoom dado.
+
+    Toda célula ocupada vira um cluster, mesmo com um ponto só (events=1); ids
+    aponta os eventos da célula.
+    """
+    cells = defaultdict(list)
+    for feature in features:
+        lon, lat = feature["geometry"]["coordinates"]
+        x, y = world_pixel(lon, lat, zoom)
+        cells[(int(x // cell_px), int(y // cell_px))].append(feature)
+
+    clusters = []
+    for (cx, cy), members in sorted(cells.items()):
+        props = [m["properties"] for m in members]
+        clusters.append({
+            "type": "Feature",
+            "id": f"z{zoom}/{cx}/{cy}",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [
+                    round(sum(m["geometry"]["coordinates"][0] for m in members) / len(members), 5),
+                    round(sum(m["geometry"]["coordinates"][1] for m in members) / len(members), 5),
+                ],
+            },
+            "properties": {
+                "events": len(members),
+                "talks": sum(p["talks"] for p in props),
+                "with_video": sum(1 for p in props if p["has_video"]),
+                "with_slides": sum(1 for p in props if p["has_slides"]),
+                "countries": sorted({p["country"] for p in props if p["country"]}),
+                "first_year": min(p["year"] for p in props),
+                "last_year": max(p["year"] for p in props),
+                "ids": [m["id"] for m in members],
+            },
+        })
+    return clusters
+
+
+def write_json(data, path):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def export(db, map_dir=MAP_DIR, zoom_levels=ZOOM_LEVELS):
+    os.makedirs(map_dir, exist_ok=True)
+    features = build_features(db)
+
+    by_year = defaultdict(list)
+    for feature in features:
+        by_year[feature["properties"]["year"]].append(feature)
+    years = sorted(by_year)
+
+    files = {"years": {}, "cumulative": {}, "clusters": {}}
+    cumulative = []
+    for year in years:
+        cumulative.extend(by_year[year])
+
+        name = f"{year}.geojson"
+        write_json(feature_collection(by_year[year], year=year), os.path.join(map_dir, name))
+        files["years"][year] = name
+
+        name = f"acumulado_{year}.geojson"
+        write_json(feature_collection(cumulative, year=year, cumulative=True), os.path.join(map_dir, name))
+        files["cumulative"][year] = name
+
+    for zoom in zoom_levels:
+        clusters = []
+        for year in years:
+            for c in cluster(by_year[year], zoom):
+                c["properties"]["year"] = year
+                c["id"] = f"{year}/{c['id']}"
+                clusters.append(c)
+        for c in cluster(features, zoom):
+            c["properties"]["year"] = "all"
+            clusters.append(c)
+
+        name = f"clusters_z{zoom}.geojson"
+        write_json(feature_collection(clusters, zoom=zoom, cell_px=CLUSTER_PX), os.path.join(map_dir, name))
+        files["clusters"][zoom] = name
+
+    write_json({"years": years, "zoom_levels": list(zoom_levels), "events": len(features), "files": files},
+               os.path.join(map_dir, "index.json"))
+    print(f"{len(features)} eventos em {len(years)} anos exportados para {map_dir}/")
+    return files
+
+
+def main():
+    db = analytics_store.connect()
+    analytics_store.load_all(db)
+    export(db)
+
+
+if __name__ == "__main__":
+    main()
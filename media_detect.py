@@ -0,0 +1,130 @@
+import re
+from urllib.parse import urljoin
+
+import httpx
+
+import http_cache
+import http_client
+
+# Uma única passada da regex cobre todas as assinaturas de vídeo e de slides
+SIGNATURES_RE = re.compile(
+    r"(?P<video>youtube\.com|youtu\.be|vimeo\.com)"
+    r"|(?P<slide>\.pdf|slideshare\.net|speakerdeck\.com|docs\.google\.com/presentation)",
+    re.IGNORECASE,
+)
+
+URL_DELIMITERS = frozenset(" \t\r\n\"'<>()")
+MAX_URL = 512
+CHUNK_SIZE = 16 * 1024
+
+
+def url_bounds(buf, start, end):
+    """Expande uma assinatura até os delimitadores do link/texto que a contém."""
+    left = max(0, start - MAX_URL)
+    while start > left and buf[start - 1] not in URL_DELIMITERS:
+        start -= 1
+
+    right = min(len(buf), end + MAX_URL)
+    while end < right and buf[end] not in URL_DELIMITERS:
+        end += 1
+
+    return start, end
+
+
+class MediaScanner:
+    """Procura links de vídeo e de slides em um texto recebido aos pedaços.
+
+    feed() devolve True quando os dois tipos já foram encontrados; daí em
+    diante o chamador não precisa mais passar o texto pelo scanner.
+    """
+
+    def __init__(self):
+        self.links = {"video": None, "slide": None}
+        self.tail = ""
+        # URL da página sendo lida, para resolver links relativos como /slides/x.pdf
+        self.base = None
+
+    @property
+    def done(self):
+        return all(self.links.values())
+
+    def feed(self, text, final=False):
+        buf = self.tail + text
+        # Guarda o fim do buffer para achar assinaturas e links cortados entre dois pedaços
+        keep = len(buf) if final else max(0, len(buf) - MAX_URL)
+
+        for match in SIGNATURES_RE.finditer(buf):
+            kind = match.lastgroup
+            if self.links[kind]:
+                continue
+
+            start, end = url_bounds(buf, match.start(), match.end())
+            if end == len(buf) and not final:
+                keep = min(keep, start)
+                break
+
+            link = buf[start:end]
+            self.links[kind] = urljoin(self.base, link) if self.base and link.startswith("/") else link
+            if self.done:
+                break
+
+        self.tail = buf[keep:]
+        return self.done
+
+
+def scan_url(url, scanner):
+    """Lê a página em streaming alimentando o scanner até ele estar decidido.
+
+    Retorna True se a página existe. Depois que o scanner se decide, o resto
+    da página ainda é lido (sem regex) para a página inteira ir para o cache
+    HTTP, de onde devopsdaysthemes e paginaWebToCsv a reaproveitam. Se o
+    scanner já estava decidido antes da página, basta um HEAD para saber se
+    ela existe.
+    """
+    scanner.base = url
+    entry, hit, text = http_cache.cached_text(url)
+    if hit:
+        if text is None:
+            return False
+        if not scanner.done:
+            scanner.feed(text, final=True)
+        return True
+
+    try:
+        if scanner.done:
+            resp = http_client.head(url)
+            if resp.status_code == 200:
+                return True
+            if resp.status_code in (404, 410):
+                http_cache.store(url, resp.status_code)
+                return False
+            # Servidor que não responde HEAD direito: segue para o GET
+
+        with http_client.stream(url, headers=http_cache.conditional_headers(entry)) as resp:
+            if resp.status_code == 304 and entry is not None:
+                text = http_cache.read_body(entry)
+                if text is None:
+                    return False
+                http_cache.touch(url, refreshed=True)
+                scanner.feed(text, final=True)
+                return True
+
+            if resp.status_code != 200:
+                http_cache.store(url, resp.status_code)
+                return False
+
+            parts = []
+            for chunk in resp.iter_text(CHUNK_SIZE):
+                parts.append(chunk)
+                if not scanner.done:
+                    scanner.feed(chunk)
+
+            if not scanner.done:
+                scanner.feed("", final=True)
+            http_cache.store(
+                url, 200, "".join(parts), resp.headers.get("ETag"), resp.headers.get("Last-Modified"),
+                str(resp.url) if str(resp.url) != url else None,
+            )
+            return True
+    except httpx.HTTPError:
+        return False
@@ -1,102 +1,35 @@
-import requests
-from bs4 import BeautifulSoup
-import re
 import csv
 import os
-import nltk
-from nltk.corpus import stopwords
-import string
+import sys
+import http_client
+import html_parse
+import tokenizer
+from csv_sort import sort_csv_by_year
+import word_store
+from event_index import load_events
 
-BASE_URL = "https://devopsdays.org"
-EVENTS_URL = f"{BASE_URL}/events/"
 OUTPUT_CSV = "words_from_webpage.csv"
-
-nltk.download("stopwords", quiet=True)
-
-STOPWORDS = set(w.lower() for w in stopwords.words("portuguese")) | set(
-    w.lower() for w in stopwords.words("english")
-)
-
-STOPWORDS.update(
-    [
-        "devopsdays", "event", "events", "program", "www", "http", "https",
-        "a", "the", "program", "contact", "events", "presentations", "blog",
-        "welcome", "reactions", "speakers", "participants", "intro", "video",
-        "slideshare", "for", "with", "in", "and", "not", "only", "ppt", "pdf",
-        "detail", "non", "do", "is", "all", "so", "how", "t", "of", "to", "non",
-        "not", "an",
-    ]
-)
-
-STOPWORDS = set(s.strip().lower() for s in STOPWORDS if s)
-
-def extract_year(text: str) -> str:
-    match = re.search(r"\b(20\d{2}|19\d{2})\b", text)
-    return match.group(1) if match else text.strip()
-
-
-def extract_city(event_name: str) -> str:
-    name = re.sub(r"\s+", " ", event_name).strip()
-
-    if " - " in name:
-        name = name.split(" - ")[0].strip()
-
-    if ":" in name:
-        parts = name.split(":")
-        name = parts[-1].strip()
-
-    name = re.sub(r"\(.*?\)", "", name).strip()
-
-    name = re.sub(r"\d+", "", name).strip()
-
-    name = re.sub(r"\s+", " ", name)
-
-    return name
-
-
-def contains_digit(token: str) -> bool:
-    return any(ch.isdigit() for ch in token)
-
-
-def normalize_token(token: str) -> str:
-    return token.strip(string.punctuation + " \t\n\r").lower()
-
-LETTER_WORD_RE = re.compile(r"[A-Za-zÀ-ÖØ-öø-ÿ]+(?:'[A-Za-zÀ-ÖØ-öø-ÿ]+)?", re.UNICODE)
+# --frequencia grava (ano, evento, termo, contagem) em vez de uma linha por ocorrência
+TERM_COUNTS = "--frequencia" in sys.argv
 
 def fetch_page_content(url):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.text
-    except requests.RequestException as e:
-        print(f"Erro ao acessar {url}: {e}")
+    # Passa pelo http_cache: páginas inalteradas não são baixadas de novo
+    html = http_client.fetch(url)
+    if html is None:
+        print(f"Erro ao acessar {url}")
         return ""
+    return html
 
 
 def extract_words_from_html(html_content):
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = html_parse.parse(html_content)
 
     for script_or_style in soup(["script", "style"]):
         script_or_style.decompose()
 
     text = soup.get_text(separator=" ")
 
-    raw_words = LETTER_WORD_RE.findall(text)
-
-    filtered = []
-    for w in raw_words:
-        w_norm = normalize_token(w)
-        if not w_norm:
-            continue
-        if contains_digit(w_norm):
-            continue
-        if len(w_norm) <= 1:
-            continue
-        if w_norm in STOPWORDS:
-            continue
-        filtered.append(w_norm)
-
-    return filtered
+    return tokenizer.extract_words(text)
 
 
 def save_words_to_csv(year, event_name, words, output_csv):
@@ -115,62 +48,27 @@ def save_words_to_csv(year, event_name, words, output_csv):
 
 
 def get_all_events():
-    print("Buscando eventos em devopsdays.org...")
-
-    html = fetch_page_content(EVENTS_URL)
-    if not html:
-        return []
-
-    soup = BeautifulSoup(html, "html.parser")
-
-    events = []
-    current_year = None
-
-    for tag in soup.find_all(["h4", "a"]):
-
-        if tag.name == "h4" and "events-page-months" in tag.get("class", []):
-            current_year = extract_year(tag.get_text(strip=True))
-
-        if tag.name == "a" and "events-page-event" in tag.get("class", []):
-            event_name = tag.get_text(strip=True)
-            event_link = tag.get("href")
-
-            if current_year and event_link:
-                full_link = BASE_URL + event_link
-                events.append(
-                    {"year": current_year, "event": event_name, "url": full_link}
-                )
+    events = [
+        {"year": ev["year"], "event": ev["label"], "url": ev["url"]}
+        for ev in load_events()
+    ]
 
     print(f"Encontrados {len(events)} eventos.")
     return events
 
-def sort_csv_by_year(output_csv):
-    if not os.path.isfile(output_csv):
-        print("CSV ainda não existe, nada para ordenar.")
-        return
-
-    rows = []
-    with open(output_csv, "r", encoding="utf-8") as csvfile:
-        reader = csv.reader(csvfile)
-        header = next(reader)
-        for row in reader:
-            rows.append(row)
-
-    rows.sort(key=lambda r: int(r[0]))
-
-    with open(output_csv, "w", encoding="utf-8", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(header)
-        writer.writerows(rows)
-
-    print("CSV ordenado por ano com sucesso!")
-
 def main():
     events = get_all_events()
     if not events:
         print("Nenhum evento encontrado.")
         return
 
+    # Cada execução regrava a saída do zero (num .tmp trocado no fim): anexar ao arquivo
+    # anterior duplicaria as linhas e, no modo --frequencia, somaria as contagens de novo
+    target = word_store.tf_path(OUTPUT_CSV) if TERM_COUNTS else OUTPUT_CSV
+    tmp = target + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+
     for ev in events:
         program_url = ev["url"].rstrip("/") + "/program"
 
@@ -184,12 +82,23 @@ def main():
             continue
 
         words = extract_words_from_html(html_content)
-        city = extract_city(ev["event"])
-        save_words_to_csv(ev["year"], city, words, OUTPUT_CSV)
+        if TERM_COUNTS:
+            counts = word_store.save_term_counts(ev["year"], ev["event"], words, tmp)
+            print(f"✔ {len(counts)} termos distintos salvos para '{ev['event']}' ({ev['year']})")
+        else:
+            save_words_to_csv(ev["year"], ev["event"], words, tmp)
+
+    if not os.path.isfile(tmp):
+        with open(tmp, "w", encoding="utf-8", newline="") as csvfile:
+            csv.writer(csvfile).writerow(word_store.TF_HEADER if TERM_COUNTS else ["Ano", "Evento", "Palavra"])
+    os.replace(tmp, target)
 
     print("\nFinalizado! Todas as palavras úteis foram coletadas.")
 
-    sort_csv_by_year(OUTPUT_CSV)
+    if TERM_COUNTS:
+        word_store.compact(target)
+    else:
+        sort_csv_by_year(OUTPUT_CSV)
 
 
 if __name__ == "__main__":
@@ -1,39 +1,28 @@
 import os
-import requests
-from bs4 import BeautifulSoup
+import httpx
 from urllib.parse import urljoin
-
-# Base URL for events
-BASE_URL = "https://devopsdays.org/events/"
+import downloader
+import http_client
+import html_parse
+from event_index import load_events
 
 def fetch_and_parse_page(url):
-    """Fetch the webpage and parse it with BeautifulSoup."""
+    """Fetch the webpage and parse only its links."""
     try:
-        response = requests.get(url)
+        response = http_client.get(url)
         response.raise_for_status()
-        return BeautifulSoup(response.content, 'html.parser')
-    except requests.RequestException as e:
+        return html_parse.parse(response.content, html_parse.LINKS)
+    except httpx.HTTPError as e:
         print(f"Failed to fetch the page: {url} - {e}")
         return None
 
-def download_file(file_url, save_path):
-    """Download a file from a given URL."""
-    try:
-        response = requests.get(file_url, stream=True)
-        response.raise_for_status()
-        with open(save_path, 'wb') as file:
-            for chunk in response.iter_content(chunk_size=1024):
-                file.write(chunk)
-        print(f"Downloaded: {save_path}")
-    except requests.RequestException as e:
-        print(f"Failed to download {file_url}: {e}")
-
-def find_and_download_presentations(event_url, event_dir):
-    """Find and download presentation files from the event page."""
+def find_presentations(event_url, event_dir):
+    """Find presentation files on the event page and return (url, save_path) pairs."""
     soup = fetch_and_parse_page(event_url)
     if not soup:
-        return
+        return []
 
+    jobs = []
     # Find all links on the event page
     links = soup.find_all('a', href=True)
     for link in links:
@@ -42,56 +31,34 @@ def find_and_download_presentations(event_url, event_dir):
         if href.lower().endswith(('.pdf', '.ppt', '.pptx')):
             file_url = urljoin(event_url, href)
             file_name = os.path.basename(href)
-            save_path = os.path.join(event_dir, file_name)
-            download_file(file_url, save_path)
+            jobs.append((file_url, os.path.join(event_dir, file_name)))
+    return jobs
 
 def create_folder_structure_and_download_presentations():
     """Create folder structure and download presentations for each event."""
-    soup = fetch_and_parse_page(BASE_URL)
-    if not soup:
-        print("Failed to fetch the main events page.")
+    events = [ev for ev in load_events() if ev["past"]]
+    if not events:
+        print("No past events found in the event index.")
         return
 
-    # Find the "Past" section
-    past_section = soup.find('h2', string='Past')
-    if not past_section:
-        print("The 'Past' section was not found.")
-        return
-
-    # Locate the parent container of the "Past" section
-    parent_container = past_section.find_next('div', class_='row')
-
     # Create a base directory for past events
     base_dir = 'Past_Events'
     os.makedirs(base_dir, exist_ok=True)
+    jobs = []
 
-    # Iterate through year sections and events
-    event_columns = parent_container.find_all('div', class_='col-md-6 col-lg-3 events-page-col')
-    for column in event_columns:
-        # Extract year
-        year_header = column.find('h4', class_='events-page-months')
-        if not year_header:
-            continue
-        year = year_header.text.strip()
-
-        # Create a folder for the year
-        year_dir = os.path.join(base_dir, year)
-        os.makedirs(year_dir, exist_ok=True)
-
-        # Extract events for the year
-        event_links = column.find_all('a', class_='events-page-event')
-        for link in event_links:
-            event_name = link.text.strip().replace(':', '-').replace('/', '-')
-            event_url = urljoin(BASE_URL, link['href'])
+    for ev in events:
+        # Folder names use the canonical city from the event index
+        event_dir = os.path.join(base_dir, ev["year"], ev["city"])
+        os.makedirs(event_dir, exist_ok=True)
+        print(f"Created folder: {event_dir}")
 
-            # Create a folder for the event
-            event_dir = os.path.join(year_dir, event_name)
-            os.makedirs(event_dir, exist_ok=True)
-            print(f"Created folder: {event_dir}")
+        print(f"Checking presentations for event: {ev['name']}")
+        jobs.extend(find_presentations(ev["url"], event_dir))
 
-            # Download presentations for the event
-            print(f"Checking presentations for event: {event_name}")
-            find_and_download_presentations(event_url, event_dir)
+    # Downloads run in parallel; files already complete on disk are skipped, partial ones resumed
+    print(f"{len(jobs)} presentation links found.")
+    # The ledger lives next to the scripts (gitignored), not inside the committed Past_Events tree
+    downloader.download_all(jobs, downloader.LEDGER_FILE)
 
     print("Folder structure and downloads completed!")
 
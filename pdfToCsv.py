@@ -1,66 +1,41 @@
 import os
-import re
 import csv
-import string
-import requests
-import nltk
-from nltk.corpus import stopwords
-from PyPDF2 import PdfReader
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import event_index
+import geocache
+import pdf_manifest
+import search_index
+import tokenizer
+from csv_sort import sort_csv_by_year
+import word_store
 
 OUTPUT_CSV = "words_from_pdfs.csv"
+WORDS_HEADER = ["Ano", "Evento", "Palavra"]
 BASE_FOLDER = "Past_Events"
-COUNTRY_CACHE = {}
-
-nltk.download("stopwords", quiet=True)
-
-STOPWORDS = set(w.lower() for w in stopwords.words("portuguese")) | set(
-    w.lower() for w in stopwords.words("english")
-)
-
-STOPWORDS.update(
-    [
-        "devopsdays", "event", "events", "program", "www", "http", "https",
-        "a", "the", "program", "contact", "events", "presentations", "blog",
-        "welcome", "reactions", "speakers", "participants", "intro", "video",
-        "slideshare", "for", "with", "in", "and", "not", "only", "ppt", "pdf",
-        "detail", "non", "do", "is", "all", "so", "how", "t", "of", "to", "non",
-        "not", "an",
-    ]
-)
-
-STOPWORDS = set(s.strip().lower() for s in STOPWORDS if s)
-
-LETTER_WORD_RE = re.compile(r"[A-Za-zÀ-ÖØ-öø-ÿ]+(?:'[A-Za-zÀ-ÖØ-öø-ÿ]+)?", re.UNICODE)
-
-def normalize_token(token: str) -> str:
-    return token.strip(string.punctuation + " \t\n\r").lower()
-
-def contains_digit(token: str) -> bool:
-    return any(ch.isdigit() for ch in token)
-
-def extract_words_from_text(text):
-    raw_words = LETTER_WORD_RE.findall(text)
-    filtered = []
-
-    for w in raw_words:
-        w_norm = normalize_token(w)
-        if not w_norm:
-            continue
-        if contains_digit(w_norm):
-            continue
-        if len(w_norm) <= 1:
-            continue
-        if w_norm in STOPWORDS:
-            continue
-        filtered.append(w_norm)
-
-    return filtered
+# --frequencia grava (ano, evento, termo, contagem) em vez de uma linha por ocorrência
+TERM_COUNTS = "--frequencia" in sys.argv
+# --paralelo distribui os PDFs entre processos; PDFs grandes são divididos em faixas de páginas
+PARALLEL = "--paralelo" in sys.argv
+PAGES_PER_TASK = 40
+SPLIT_MIN_BYTES = 5 * 1024 * 1024
+# --completo ignora o manifesto e reextrai todos os PDFs
+FULL_RUN = "--completo" in sys.argv
+# --indexar atualiza o índice de busca (search_index.py) com os PDFs extraídos
+INDEX = "--indexar" in sys.argv
+# Incrementar quando a extração/tokenização mudar, para invalidar os shards antigos
+# (v2: shards guardam as posições dos tokens descartados)
+EXTRACTOR_VERSION = 2
+
+def extract_text_from_pdf(file_path, start=0, end=None):
+    # Import tardio: uma execução sem PDFs novos nem chega a carregar o PyPDF2
+    from PyPDF2 import PdfReader
 
-def extract_text_from_pdf(file_path):
     try:
         reader = PdfReader(file_path)
         text = ""
-        for page in reader.pages:
+        for page in reader.pages[start:end]:
             extracted = page.extract_text()
             if extracted:
                 text += extracted + "\n"
@@ -69,6 +44,59 @@ def extract_text_from_pdf(file_path):
         print(f"Erro ao ler PDF {file_path}: {e}")
         return ""
 
+def extract_pdf_terms(task):
+    """Worker: extrai uma faixa de páginas e devolve as palavras (ou Counter), ou None se vazia.
+
+    A lista de palavras tem "" no lugar dos tokens descartados, para o shard guardar as posições.
+    """
+    file_path, start, end, counts = task
+    text = extract_text_from_pdf(file_path, start, end)
+    if not text.strip():
+        return None
+    slots = tokenizer.extract_word_slots(text)
+    return Counter(filter(None, slots)) if counts else slots
+
+def page_ranges(file_path):
+    """Divide PDFs grandes em faixas de PAGES_PER_TASK páginas; os pequenos viram uma tarefa só."""
+    if os.path.getsize(file_path) < SPLIT_MIN_BYTES:
+        return [(0, None)]
+    from PyPDF2 import PdfReader
+
+    try:
+        total = len(PdfReader(file_path).pages)
+    except Exception:
+        return [(0, None)]
+    return [(start, start + PAGES_PER_TASK) for start in range(0, total, PAGES_PER_TASK)] or [(0, None)]
+
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def extract_parallel(docs, counts, workers=None):
+    """Extrai os documentos em um ProcessPoolExecutor e devolve (doc, resultado) na ordem de docs."""
+    tasks, owners = [], []
+    for i, doc in enumerate(docs):
+        for start, end in page_ranges(doc[3]):
+            tasks.append((doc[3], start, end, counts))
+            owners.append(i)
+
+    workers = workers or available_cpus()
+    print(f"Extraindo {len(docs)} PDFs ({len(tasks)} tarefas) em {workers} processos...")
+
+    results = [None] * len(docs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for owner, part in zip(owners, pool.map(extract_pdf_terms, tasks, chunksize=4)):
+            if part is None:
+                continue
+            if results[owner] is None:
+                results[owner] = part
+            else:
+                results[owner] += part
+
+    return zip(docs, results)
+
 def save_words_to_csv(year, city, country, words, output_csv):
     file_exists = os.path.isfile(output_csv)
     location = f"{city} - {country}"
@@ -77,110 +105,152 @@ def save_words_to_csv(year, city, country, words, output_csv):
         writer = csv.writer(csvfile)
 
         if not file_exists:
-            writer.writerow(["Ano", "Evento", "Palavra"])
+            writer.writerow(WORDS_HEADER)
 
         for word in words:
             writer.writerow([year, location, word])
 
     print(f"{len(words)} palavras salvas de → {city} ({year})")
 
-def sort_csv_by_year(output_csv):
-    if not os.path.isfile(output_csv):
-        print("CSV ainda não existe.")
-        return
-
-    rows = []
-    with open(output_csv, "r", encoding="utf-8") as csvfile:
-        reader = csv.reader(csvfile)
-        header = next(reader)
-        for row in reader:
-            rows.append(row)
+def list_pdfs():
+    """Lista (ano, cidade, país, caminho) de cada PDF em BASE_FOLDER.
 
-    rows.sort(key=lambda r: int(r[0]))
-
-    with open(output_csv, "w", encoding="utf-8", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(header)
-        writer.writerows(rows)
-
-    print("CSV ordenado por ano!")
+    As pastas têm o nome canônico do índice de eventos; o país vem do próprio
+    índice, para que "Cidade - País" seja o mesmo rótulo das talks. Pastas fora
+    do índice são geocodificadas pelo nome.
+    """
+    years = [
+        year for year in os.listdir(BASE_FOLDER)
+        if year.isdigit() and os.path.isdir(os.path.join(BASE_FOLDER, year))
+    ]
+    folders = [
+        (year, city)
+        for year in years
+        for city in os.listdir(os.path.join(BASE_FOLDER, year))
+        if os.path.isdir(os.path.join(BASE_FOLDER, year, city))
+    ]
+    countries = {}
+    if os.path.isfile(event_index.INDEX_FILE):
+        indexed = {(ev["year"], ev["city"]): ev["country"] for ev in event_index.load_events()}
+        countries = {folder: indexed[folder] for folder in folders if folder in indexed}
+    by_name = geocache.get_countries([city for year, city in folders if (year, city) not in countries])
+    for year, city in folders:
+        countries.setdefault((year, city), by_name.get(city))
+
+    docs = []
+    for year in sorted(years):
+        year_path = os.path.join(BASE_FOLDER, year)
 
+        for city in sorted(os.listdir(year_path)):
+            city_path = os.path.join(year_path, city)
+            if not os.path.isdir(city_path):
+                continue
 
-def get_country(city):
-    city_key = city.lower().strip()
+            for file in sorted(os.listdir(city_path)):
+                if file.lower().endswith(".pdf"):
+                    docs.append((year, city, countries[(year, city)], os.path.join(city_path, file)))
 
-    if city_key in COUNTRY_CACHE:
-        return COUNTRY_CACHE[city_key]
+    return docs
 
-    country = "Unknown"
+def extract_serial(docs, counts):
+    current = None
+    for doc in docs:
+        year, city, country, file_path = doc
+        if (year, city) != current:
+            current = (year, city)
+            print(f"\nProcessando: {year}/{city}/{country}")
 
-    try:
-        r = requests.get(
-            "https://geocoding-api.open-meteo.com/v1/search",
-            params={
-                "name": city,
-                "count": 1,
-                "language": "en",
-                "format": "json",
-            },
-            timeout=10,
-        )
+        print(f"   → Lendo PDF: {os.path.basename(file_path)}")
+        yield doc, extract_pdf_terms((file_path, 0, None, counts))
 
-        if r.status_code != 200:
-            COUNTRY_CACHE[city_key] = "Unknown"
-            return "Unknown"
+def rebuild_output(docs, manifest):
+    """Remonta a saída a partir dos shards, na ordem dos documentos, e troca o arquivo no fim."""
+    target = word_store.tf_path(OUTPUT_CSV) if TERM_COUNTS else OUTPUT_CSV
+    tmp = target + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
 
-        data = r.json()
+    for year, city, country, file_path in docs:
+        entry = manifest["documents"][file_path]
+        if entry["words"] is None:
+            continue
 
-        results = data.get("results", [])
-        if not results:
-            COUNTRY_CACHE[city_key] = "Unknown"
-            return "Unknown"
+        words = pdf_manifest.read_shard(entry["shard"])
+        if TERM_COUNTS:
+            word_store.save_term_counts(year, f"{city} - {country}", words, tmp)
+        else:
+            save_words_to_csv(year, city, country, words, tmp)
 
-        country = results[0].get("country", "Unknown")
+    if not os.path.isfile(tmp):
+        # Nenhum PDF com palavras (todos removidos ou ilegíveis): a saída fica só com o cabeçalho
+        with open(tmp, "w", encoding="utf-8", newline="") as csvfile:
+            csv.writer(csvfile).writerow(word_store.TF_HEADER if TERM_COUNTS else WORDS_HEADER)
 
-    except:
-        country = "Unknown"
+    os.replace(tmp, target)
+    return target
 
-    COUNTRY_CACHE[city_key] = country
-    return country
+def update_search_index(manifest):
+    index = search_index.SearchIndex()
+    added, removed = index.sync_pdfs(manifest)
+    index.close()
+    print(f"Índice de busca: {added} PDFs indexados, {removed} removidos.")
 
 def main():
     if not os.path.isdir(BASE_FOLDER):
         print(f"Pasta '{BASE_FOLDER}' não existe.")
         return
 
-    for year in os.listdir(BASE_FOLDER):
-        year_path = os.path.join(BASE_FOLDER, year)
-        if not os.path.isdir(year_path):
-            continue
-        if not year.isdigit():
-            continue
+    docs = list_pdfs()
+    manifest = pdf_manifest.load()
+    pending, removed = pdf_manifest.plan(
+        manifest, [doc[3] for doc in docs], EXTRACTOR_VERSION, force=FULL_RUN
+    )
+
+    # O rótulo do evento acompanha o índice de eventos mesmo para PDFs sem mudança
+    for year, city, country, file_path in docs:
+        entry = manifest["documents"].get(file_path)
+        if entry:
+            entry["event"] = f"{city} - {country}"
+
+    target = word_store.tf_path(OUTPUT_CSV) if TERM_COUNTS else OUTPUT_CSV
+    if not pending and not removed and os.path.isfile(target):
+        pdf_manifest.save(manifest)
+        print("Nenhum PDF novo, alterado ou removido. Nada a fazer.")
+        if INDEX:
+            update_search_index(manifest)
+        return
 
-        for city in os.listdir(year_path):
-            country = get_country(city)
-            city_path = os.path.join(year_path, city)
-            if not os.path.isdir(city_path):
-                continue
+    print(f"{len(pending)} PDFs para extrair, {len(removed)} removidos, {len(docs) - len(pending)} sem mudança.")
 
-            print(f"\nProcessando: {year}/{city}/{country}")
+    stats = {path: (sha256, size, mtime) for path, sha256, size, mtime in pending}
+    todo = [doc for doc in docs if doc[3] in stats]
+    if PARALLEL:
+        results = extract_parallel(todo, False)
+    else:
+        results = extract_serial(todo, False)
 
-            for file in os.listdir(city_path):
-                if not file.lower().endswith(".pdf"):
-                    continue
+    for (year, city, country, file_path), words in results:
+        if words is None:
+            print(f"   (PDF vazio ou ilegível: {file_path})")
+        pdf_manifest.record(
+            manifest, file_path, *stats[file_path], EXTRACTOR_VERSION, words, event=f"{city} - {country}"
+        )
 
-                file_path = os.path.join(city_path, file)
-                print(f"   → Lendo PDF: {file}")
+    for path in removed:
+        print(f"   PDF removido, retirando suas palavras: {path}")
+        pdf_manifest.retract(manifest, path)
 
-                text = extract_text_from_pdf(file_path)
-                if not text.strip():
-                    print("   (PDF vazio ou ilegível)")
-                    continue
+    pdf_manifest.save(manifest)
 
-                words = extract_words_from_text(text)
-                save_words_to_csv(year, city, country, words, OUTPUT_CSV)
+    # Escrita única e ordenada, feita só pelo processo principal
+    rebuild_output(docs, manifest)
 
-    sort_csv_by_year(OUTPUT_CSV)
+    if TERM_COUNTS:
+        word_store.compact(target)
+    else:
+        sort_csv_by_year(OUTPUT_CSV)
+    if INDEX:
+        update_search_index(manifest)
     print("\nFinalizado!")
 
 if __name__ == "__main__":
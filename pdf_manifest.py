@@ -0,0 +1,129 @@
+import gzip
+import hashlib
+import json
+import os
+
+MANIFEST_FILE = "pdf_manifest.json"
+SHARDS_DIR = ".pdf_shards"
+MANIFEST_VERSION = 1
+
+
+def load(path=MANIFEST_FILE):
+    if os.path.isfile(path):
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    return {"version": MANIFEST_VERSION, "documents": {}}
+
+
+def save(manifest, path=MANIFEST_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def shard_path(sha256, extractor):
+    return os.path.join(SHARDS_DIR, f"{sha256}.v{extractor}.txt.gz")
+
+
+def write_shard(sha256, extractor, words):
+    """Guarda as palavras de um documento (uma por linha) para remontar a saída sem reextrair.
+
+    Linhas vazias marcam tokens descartados (stopwords etc.), para o índice de
+    busca ter as posições reais das palavras no texto.
+    """
+    path = shard_path(sha256, extractor)
+    os.makedirs(SHARDS_DIR, exist_ok=True)
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        f.write("\n".join(words))
+    os.replace(tmp, path)
+    return path
+
+
+def read_shard(path, gaps=False):
+    """Palavras do shard; com gaps=True mantém "" no lugar dos tokens descartados."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = f.read()
+    words = data.split("\n") if data else []
+    return words if gaps else [w for w in words if w]
+
+
+def plan(manifest, paths, extractor, force=False):
+    """Compara os PDFs atuais com o manifesto.
+
+    Retorna (pendentes, removidos): caminhos que precisam ser extraídos e
+    caminhos que saíram da pasta. Tamanho e mtime iguais evitam até o hash;
+    um arquivo só tocado (mesmo hash) reaproveita o shard existente.
+    """
+    documents = manifest["documents"]
+    pending = []
+
+    for path in paths:
+        st = os.stat(path)
+        entry = documents.get(path)
+        usable = (
+            not force
+            and entry is not None
+            and entry["extractor"] == extractor
+            and os.path.isfile(entry["shard"])
+        )
+
+        if usable and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime_ns:
+            continue
+
+        sha256 = file_sha256(path)
+        if usable and entry["sha256"] == sha256:
+            entry.update(size=st.st_size, mtime=st.st_mtime_ns)
+            continue
+
+        pending.append((path, sha256, st.st_size, st.st_mtime_ns))
+
+    current = set(paths)
+    removed = [path for path in documents if path not in current]
+    return pending, removed
+
+
+def drop_unused_shard(manifest, shard):
+    if any(e["shard"] == shard for e in manifest["documents"].values()):
+        return
+    try:
+        os.remove(shard)
+    except OSError:
+        pass
+
+
+def record(manifest, path, sha256, size, mtime, extractor, words, event=None):
+    """Registra a extração de um documento (words=None para PDFs vazios ou ilegíveis).
+
+    event é o rótulo "Cidade - País" do evento, o mesmo das tabelas de palavras e das talks.
+    """
+    shard = write_shard(sha256, extractor, words or [])
+    old = manifest["documents"].get(path)
+    manifest["documents"][path] = {
+        "size": size,
+        "mtime": mtime,
+        "sha256": sha256,
+        "extractor": extractor,
+        "shard": shard,
+        "words": None if words is None else sum(1 for w in words if w),
+        "event": event,
+    }
+    if old is not None and old["shard"] != shard:
+        drop_unused_shard(manifest, old["shard"])
+
+
+def retract(manifest, path):
+    """Remove um documento do manifesto e apaga o shard se nenhum outro o usa."""
+    entry = manifest["documents"].pop(path)
+    drop_unused_shard(manifest, entry["shard"])
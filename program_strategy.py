@@ -0,0 +1,86 @@
+import json
+import os
+from collections import Counter
+from urllib.parse import urlsplit
+
+STRATEGY_FILE = "program_strategy.json"
+
+# Ordem padrão; o LLM fica por último porque é o único que custa dinheiro (exceto nos
+# eventos em que ele é a estratégia aprendida)
+DEFAULT_ORDER = ("modern", "legacy_complex", "legacy", "llm")
+PAID = "llm"
+
+# Estratégia → página de programa que ela usa
+STRATEGY_PAGES = {
+    "modern": "modern",
+    "legacy_complex": "legacy",
+    "legacy": "legacy",
+    "llm": "legacy",
+}
+
+
+def pattern_key(event_url, year):
+    """Eventos do mesmo host e ano costumam usar o mesmo layout de programa."""
+    return f"{urlsplit(event_url).hostname}/{year}"
+
+
+class StrategyStore:
+    """Lembra qual parser funcionou para cada evento e, por extensão, para cada host/ano.
+
+    Um evento já conhecido vai direto para a estratégia que funcionou (inclusive o LLM);
+    um evento novo tenta primeiro o parser gratuito que mais funcionou no mesmo host/ano. As demais continuam como
+    fallback, então um palpite errado custa requisições, não talks.
+    """
+
+    def __init__(self, path=STRATEGY_FILE, default_order=DEFAULT_ORDER):
+        self.path = path
+        self.default_order = default_order
+        self.events = {}
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.events = json.load(f)
+
+        self.patterns = {}
+        for url, entry in self.events.items():
+            self._count(url, entry, 1)
+
+    def _count(self, url, entry, delta):
+        counts = self.patterns.setdefault(pattern_key(url, entry["year"]), Counter())
+        counts[entry["strategy"]] += delta
+
+    def order(self, event_url, year):
+        counts = self.patterns.get(pattern_key(event_url, year), Counter())
+        free = [s for s in self.default_order if s != PAID]
+        ranked = sorted(free, key=lambda s: (-counts[s], self.default_order.index(s)))
+
+        known = self.events.get(event_url)
+        preferred = known["strategy"] if known else (counts.most_common(1)[0][0] if +counts else None)
+        if preferred in STRATEGY_PAGES:
+            # Parsers da mesma página da estratégia preferida vêm antes, para não baixar a outra página à toa
+            page = STRATEGY_PAGES[preferred]
+            ranked.sort(key=lambda s: (s != preferred, STRATEGY_PAGES[s] != page))
+
+        if PAID not in self.default_order:
+            return ranked
+        if known and known["strategy"] == PAID:
+            # Evento em que só o LLM funcionou: vai direto a ele (a resposta costuma vir do cache)
+            # em vez de baixar e parsear a página moderna a cada execução
+            return [PAID] + ranked
+        return ranked + [PAID]
+
+    def learn(self, event_url, year, strategy):
+        """Registra a estratégia que funcionou; None esquece o evento (nenhuma funcionou)."""
+        previous = self.events.pop(event_url, None)
+        if previous:
+            self._count(event_url, previous, -1)
+
+        if strategy is not None:
+            entry = {"year": year, "strategy": strategy}
+            self.events[event_url] = entry
+            self._count(event_url, entry, 1)
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.events, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
@@ -0,0 +1,360 @@
+"""Índice invertido persistente sobre títulos de talks e texto dos PDFs, com ranking BM25.
+
+Uso:
+    python search_index.py kubernetes observability
+    python search_index.py '"infrastructure as code"' --tipo pdf
+    python search_index.py --atualizar            # só sincroniza o índice
+
+As posições contam todas as palavras do texto, inclusive stopwords (que não são
+indexadas). Numa frase, a stopword só ocupa sua posição: "infrastructure as code"
+casa com "infrastructure as code" e "infrastructure for code", mas não com
+"infrastructure code".
+"""
+import csv
+import hashlib
+import heapq
+import math
+import os
+import re
+import sqlite3
+import sys
+import time
+from array import array
+from collections import defaultdict
+
+import pdf_manifest
+import tokenizer
+
+DB_FILE = os.getenv("SEARCH_INDEX_DB", "search_index.sqlite")
+TALKS_CSV = "talks_program.csv"
+
+# Parâmetros padrão do BM25
+K1 = 1.2
+B = 0.75
+
+PHRASE_RE = re.compile(r'"([^"]+)"')
+# Incrementar quando a tokenização ou as posições mudarem: todos os documentos são reindexados
+INDEX_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    version TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    year INTEGER,
+    event TEXT,
+    title TEXT,
+    location TEXT,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE,
+    df INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    positions BLOB NOT NULL,
+    PRIMARY KEY (term_id, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats VALUES ('docs', 0), ('tokens', 0);
+"""
+
+
+def talk_key(year, event, author, title):
+    digest = hashlib.sha1(f"{year}\0{event}\0{author}\0{title}".encode("utf-8")).hexdigest()
+    return f"talk:{digest}"
+
+
+def pdf_doc_info(path):
+    """Past_Events/<ano>/<cidade>/<arquivo>.pdf → (ano, cidade, arquivo)."""
+    parts = os.path.normpath(path).split(os.sep)
+    year = int(parts[-3]) if len(parts) >= 3 and parts[-3].isdigit() else None
+    city = parts[-2] if len(parts) >= 2 else None
+    return year, city, parts[-1]
+
+
+def term_positions(slots):
+    """Posição de cada termo no texto; slots tem "" no lugar das palavras não indexadas."""
+    positions = defaultdict(list)
+    for pos, term in enumerate(slots):
+        if term:
+            positions[term].append(pos)
+    return positions
+
+
+def strip_gaps(slots):
+    start, end = 0, len(slots)
+    while start < end and not slots[start]:
+        start += 1
+    while end > start and not slots[end - 1]:
+        end -= 1
+    return slots[start:end]
+
+
+def parse_query(query, tok):
+    """Separa frases entre aspas dos termos soltos; ambos passam pelo mesmo tokenizador do índice."""
+    # Frases mantêm "" no lugar das stopwords, para exigir o mesmo espaçamento no texto
+    phrases = [strip_gaps(tok.slots(p)) for p in PHRASE_RE.findall(query)]
+    phrases = [p for p in phrases if p]
+    loose = tok.tokens(PHRASE_RE.sub(" ", query))
+    return phrases, loose
+
+
+def phrase_match(positions):
+    """positions: (deslocamento na frase, posições no documento) de cada termo indexado da frase."""
+    (first_offset, first), *rest = positions
+    starts = {p - first_offset for p in first}
+    for offset, later in rest:
+        starts &= {p - offset for p in later}
+        if not starts:
+            return False
+    return True
+
+
+class SearchIndex:
+    """Índice invertido termo → postings (documento, tf, posições) em SQLite.
+
+    Documentos são talks (título) e PDFs (palavras do shard do manifesto, já
+    tokenizadas). A atualização é incremental: só entram e saem os documentos
+    cuja versão mudou.
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.tokenizer = tokenizer.default_tokenizer()
+        self._lengths = None
+
+    def close(self):
+        self.db.close()
+
+    def stat(self, name):
+        return self.db.execute("SELECT value FROM stats WHERE name = ?", (name,)).fetchone()[0]
+
+    def _bump(self, docs, tokens):
+        self.db.execute("UPDATE stats SET value = value + ? WHERE name = 'docs'", (docs,))
+        self.db.execute("UPDATE stats SET value = value + ? WHERE name = 'tokens'", (tokens,))
+
+    def add(self, key, version, kind, slots, year=None, event=None, title=None, location=None):
+        """slots: termos do documento na ordem do texto, com "" nas palavras não indexadas."""
+        length = sum(1 for term in slots if term)
+        doc_id = self.db.execute(
+            "INSERT INTO docs (key, version, kind, year, event, title, location, length) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) RETURNING id",
+            (key, version, kind, year, event, title, location, length),
+        ).fetchone()[0]
+
+        rows = []
+        for term, positions in term_positions(slots).items():
+            term_id = self.db.execute(
+                "INSERT INTO terms (term, df) VALUES (?, 1) "
+                "ON CONFLICT (term) DO UPDATE SET df = df + 1 RETURNING id",
+                (term,),
+            ).fetchone()[0]
+            rows.append((term_id, doc_id, len(positions), array("I", positions).tobytes()))
+
+        self.db.executemany("INSERT INTO postings VALUES (?, ?, ?, ?)", rows)
+        self._bump(1, length)
+        self._lengths = None
+
+    def remove(self, key):
+        row = self.db.execute("SELECT id, length FROM docs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return
+        doc_id, length = row
+
+        self.db.execute(
+            "UPDATE terms SET df = df - 1 WHERE id IN (SELECT term_id FROM postings WHERE doc_id = ?)",
+            (doc_id,),
+        )
+        self.db.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+        self.db.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+        self._bump(-1, -length)
+        self._lengths = None
+
+    def versions(self, kind):
+        return dict(self.db.execute("SELECT key, version FROM docs WHERE kind = ?", (kind,)))
+
+    def sync(self, kind, documents):
+        """documents: {key: (version, slots_fn, campos)} com o estado atual; retorna (novos, removidos)."""
+        indexed = self.versions(kind)
+        added = removed = 0
+
+        with self.db:
+            for key in indexed.keys() - documents.keys():
+                self.remove(key)
+                removed += 1
+
+            for key, (version, slots_fn, fields) in documents.items():
+                if indexed.get(key) == version:
+                    continue
+                if key in indexed:
+                    self.remove(key)
+                    removed += 1
+                self.add(key, version, kind, slots_fn(), **fields)
+                added += 1
+
+            self.db.execute("DELETE FROM terms WHERE df <= 0")
+
+        return added, removed
+
+    def sync_talks(self, path=TALKS_CSV):
+        documents = {}
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                title = (row.get("titulo") or "").strip()
+                if not title or not (row.get("ano") or "").isdigit():
+                    continue
+                key = talk_key(row["ano"], row["local"], row["autor"], title)
+                documents[key] = (f"{key}.i{INDEX_VERSION}", lambda title=title: self.tokenizer.slots(title), {
+                    "year": int(row["ano"]),
+                    "event": row["local"],
+                    "title": f"{row['autor']} - {title}" if row["autor"] else title,
+                    "location": row["link"],
+                })
+        return self.sync("talk", documents)
+
+    def sync_pdfs(self, manifest=None):
+        """Indexa os PDFs do manifesto de extração a partir dos shards (sem reabrir os PDFs).
+
+        O evento é o rótulo "Cidade - País" gravado no manifesto, o mesmo das talks.
+        """
+        manifest = manifest or pdf_manifest.load()
+        documents = {}
+        for path, entry in manifest["documents"].items():
+            if not entry.get("words"):
+                continue
+            year, city, name = pdf_doc_info(path)
+            documents[f"pdf:{path}"] = (
+                f"{entry['sha256']}.v{entry['extractor']}.i{INDEX_VERSION}",
+                lambda shard=entry["shard"]: pdf_manifest.read_shard(shard, gaps=True),
+                {"year": year, "event": entry.get("event") or city, "title": name, "location": path},
+            )
+        return self.sync("pdf", documents)
+
+    def lengths(self):
+        if self._lengths is None:
+            self._lengths = dict(self.db.execute("SELECT id, length FROM docs"))
+        return self._lengths
+
+    def search(self, query, n=10, kind=None):
+        """BM25 sobre os termos da consulta; frases entre aspas precisam aparecer em sequência.
+
+        Stopwords da frase não são indexadas; só exigem que haja uma palavra naquela posição.
+        """
+        phrases, loose = parse_query(query, self.tokenizer)
+        terms = list(dict.fromkeys(loose + [t for p in phrases for t in p if t]))
+        if not terms:
+            return []
+
+        placeholders = ",".join("?" * len(terms))
+        term_rows = self.db.execute(
+            f"SELECT term, id, df FROM terms WHERE term IN ({placeholders})", terms
+        ).fetchall()
+        found = {term: (term_id, df) for term, term_id, df in term_rows}
+        if any(t not in found for p in phrases for t in p if t):
+            return []
+
+        doc_count = self.stat("docs")
+        avg_len = self.stat("tokens") / doc_count if doc_count else 0
+        lengths = self.lengths()
+        phrase_terms = {t for p in phrases for t in p if t}
+
+        scores = defaultdict(float)
+        positions = {}
+        for term, (term_id, df) in found.items():
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            with_positions = term in phrase_terms
+            columns = "p.doc_id, p.tf, p.positions" if with_positions else "p.doc_id, p.tf"
+            if kind is None:
+                sql, params = f"SELECT {columns} FROM postings p WHERE p.term_id = ?", (term_id,)
+            else:
+                sql = (f"SELECT {columns} FROM postings p JOIN docs d ON d.id = p.doc_id "
+                       "WHERE p.term_id = ? AND d.kind = ?")
+                params = (term_id, kind)
+            for row in self.db.execute(sql, params):
+                doc_id, tf = row[0], row[1]
+                norm = 1 - B + B * lengths.get(doc_id, avg_len) / avg_len if avg_len else 1
+                scores[doc_id] += idf * tf * (K1 + 1) / (tf + K1 * norm)
+                if with_positions:
+                    positions[(term, doc_id)] = row[2]
+
+        candidates = scores
+        for phrase in phrases:
+            candidates = {
+                doc_id: score for doc_id, score in candidates.items()
+                if all((t, doc_id) in positions for t in phrase if t)
+                and phrase_match([
+                    (offset, array("I", positions[(t, doc_id)])) for offset, t in enumerate(phrase) if t
+                ])
+            }
+
+        ranked = heapq.nlargest(n, ((score, doc_id) for doc_id, score in candidates.items()))
+        docs = {
+            row[0]: row[1:]
+            for row in self.db.execute(
+                f"SELECT id, kind, year, event, title, location FROM docs WHERE id IN ({','.join('?' * len(ranked))})",
+                [doc_id for _, doc_id in ranked],
+            )
+        }
+
+        results = []
+        for score, doc_id in ranked:
+            kind_, year, event, title, location = docs[doc_id]
+            results.append({
+                "score": round(score, 4),
+                "kind": kind_,
+                "year": year,
+                "event": event,
+                "title": title,
+                "location": location,
+            })
+        return results
+
+
+def update(index):
+    if os.path.isfile(TALKS_CSV):
+        added, removed = index.sync_talks(TALKS_CSV)
+        print(f"Talks: {added} indexadas, {removed} removidas.")
+    if os.path.isfile(pdf_manifest.MANIFEST_FILE):
+        added, removed = index.sync_pdfs()
+        print(f"PDFs: {added} indexados, {removed} removidos.")
+
+
+def main():
+    args = sys.argv[1:]
+    kind = None
+    if "--tipo" in args:
+        i = args.index("--tipo")
+        kind = args[i + 1]
+        del args[i:i + 2]
+
+    index = SearchIndex()
+    if "--atualizar" in args or index.stat("docs") == 0:
+        update(index)
+    query = " ".join(a for a in args if not a.startswith("--"))
+    if not query:
+        return
+
+    start = time.perf_counter()
+    results = index.search(query, kind=kind)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for r in results:
+        print(f"{r['score']:>8.3f}  {r['year']} | {r['event']} | {r['title']} | {r['location']}")
+    print(f"{len(results)} resultados em {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
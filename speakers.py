@@ -0,0 +1,329 @@
+"""Resolução de palestrantes: separa coautores, normaliza nomes e agrupa grafias do mesmo autor.
+
+Só pares que compartilham uma chave de bloqueio (fonética do sobrenome + inicial,
+nas duas ordens) são comparados, então o custo cresce quase linearmente com o
+histórico. Os ids ficam em speaker_ids.json e se mantêm entre execuções.
+
+Saídas:
+    speakers.csv        id, nome canônico, talks, eventos, anos e variantes
+    talk_speakers.csv   cada talk ligada ao(s) id(s) dos seus autores
+"""
+import csv
+import hashlib
+import itertools
+import json
+import os
+import re
+import sys
+import unicodedata
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+TALKS_CSV = "talks_program.csv"
+SPEAKERS_CSV = "speakers.csv"
+TALK_SPEAKERS_CSV = "talk_speakers.csv"
+IDS_FILE = "speaker_ids.json"
+
+SPLIT_RE = re.compile(r"\s*(?:,|;|/|&|\+|\band\b)\s*", re.IGNORECASE)
+# "e"/"y" também aparecem dentro de nomes ("Ortega y Gasset"): só separam quando os dois lados têm 2+ palavras
+CONJ_RE = re.compile(r"\s+(?:e|y)\s+", re.IGNORECASE)
+AFFILIATION_RE = re.compile(r"\s+(?:from|@|at)\s+.*$", re.IGNORECASE)
+# Partículas ignoradas na comparação ("Maria da Silva" = "Maria Silva")
+PARTICLES = {
+    "da", "de", "do", "das", "dos", "del", "della", "di", "du", "la", "le", "van", "von", "der", "den", "bin",
+    "e", "y",
+}
+# Palavras que indicam que o trecho é título de talk, não nome de pessoa
+NON_NAME_WORDS = {
+    "the", "of", "to", "in", "for", "with", "on", "is", "are", "how", "what", "why", "your", "my",
+    "our", "we", "it", "devops", "cloud", "ops", "team", "teams", "lightning", "talks", "talk",
+    "keynote", "panel", "workshop", "ceo", "cto", "inc", "ltd", "session", "space", "break", "lunch",
+    "opening", "closing", "welcome", "sponsors", "organizers",
+}
+MAX_TOKENS = 5
+# Blocos maiores que isso são chaves genéricas demais; não geram comparações
+MAX_BLOCK = 300
+SIMILARITY = 0.85
+
+
+def strip_accents(text):
+    return "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+
+
+def name_tokens(name):
+    """Tokens normalizados: sem acento, minúsculos, sem pontuação nem partículas."""
+    text = re.sub(r"[^a-z0-9 ]+", " ", strip_accents(name).casefold())
+    return [t for t in text.split() if t not in PARTICLES]
+
+
+def looks_like_name(segment):
+    words = segment.split()
+    if not 1 <= len(words) <= MAX_TOKENS or any(ch.isdigit() for ch in segment):
+        return False
+    if any(w.casefold().strip(".,:!?") in NON_NAME_WORDS for w in words):
+        return False
+    return all(w[0].isupper() or w.casefold() in PARTICLES for w in words if w[0].isalpha())
+
+
+def split_conjunction(segment):
+    """'Ana Silva e João Souza' → dois nomes; 'Ana e Silva' fica inteiro."""
+    parts = CONJ_RE.split(segment)
+    if len(parts) > 1 and all(len(part.split()) >= 2 for part in parts):
+        return parts
+    return [segment]
+
+
+def split_authors(author):
+    """'Eduardo Munari, Pedro Ignacio' → ['Eduardo Munari', 'Pedro Ignacio']; descarta o que não parece nome."""
+    names = []
+    for chunk in SPLIT_RE.split(author or ""):
+        for segment in split_conjunction(" ".join(chunk.split())):
+            segment = AFFILIATION_RE.sub("", segment).strip(" .-–")
+            if segment and looks_like_name(segment):
+                names.append(segment)
+    return names
+
+
+def soundex(token):
+    codes = {c: str(d) for d, letters in enumerate(["aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"])
+             for c in letters}
+    token = re.sub(r"[^a-z]", "", token)
+    if not token:
+        return ""
+    out = [token[0]]
+    last = codes.get(token[0], "")
+    for ch in token[1:]:
+        code = codes.get(ch, "")
+        if code != last and code not in ("", "0"):
+            out.append(code)
+        if ch not in "hw":
+            last = code
+    return "".join(out)[:4].ljust(4, "0")
+
+
+def blocking_keys(tokens):
+    """Sobrenome fonético + inicial do primeiro nome, nas duas ordens (cobre "Silva Maria" e "M. Silva")."""
+    if len(tokens) == 1:
+        return {f"1|{tokens[0]}"}
+    first, last = tokens[0], tokens[-1]
+    return {f"{soundex(last)}|{first[0]}", f"{soundex(first)}|{last[0]}"}
+
+
+def similar(a, b):
+    return a == b or (min(len(a), len(b)) >= 4 and SequenceMatcher(None, a, b).ratio() >= SIMILARITY)
+
+
+def compatible_first(a, b):
+    """Primeiros nomes compatíveis: iguais, parecidos ou um é a inicial do outro."""
+    if len(a) == 1 or len(b) == 1:
+        return a[0] == b[0]
+    return similar(a, b)
+
+
+def has_initial(tokens):
+    return any(len(t) == 1 for t in tokens)
+
+
+def matched_first(a, b):
+    """Primeiro nome de b que casou com o de a (nas duas ordens), ou None se não são a mesma pessoa."""
+    if len(a) == 1 or len(b) == 1:
+        return None
+    for first, last in ((b[0], b[-1]), (b[-1], b[0])):
+        if similar(a[-1], last) and compatible_first(a[0], first):
+            return first
+    return None
+
+
+def same_person(a, b):
+    return sorted(a) == sorted(b) or matched_first(a, b) is not None
+
+
+def initial_match(short, full):
+    """Nome com inicial contra nome completo: além do casamento normal, as palavras
+    completas do nome abreviado precisam existir no outro ("J Paul Reed" ≠ "Josh Reed")."""
+    first = matched_first(short, full)
+    if first is None or not all(any(similar(t, u) for u in full) for t in short if len(t) > 1):
+        return None
+    return first
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        self.parent.setdefault(x, x)
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def resolve(keys):
+    """Agrupa as chaves normalizadas (tuplas de tokens) que são a mesma pessoa; retorna {chave: raiz}.
+
+    Nomes completos são agrupados entre si primeiro. Um nome com inicial ("J Smith")
+    só entra num grupo se todos os nomes completos com que casa forem desse único
+    grupo e tiverem o mesmo primeiro nome; senão fica sozinho, para não unir
+    "John Smith" e "Jane Smith" através dele.
+    """
+    blocks = defaultdict(list)
+    for key in keys:
+        for block in blocking_keys(key):
+            blocks[block].append(key)
+
+    uf = UnionFind()
+    comparisons = 0
+    # chave com inicial → [(nome completo que casou, primeiro nome casado)]
+    candidates = defaultdict(list)
+    for members in blocks.values():
+        if len(members) > MAX_BLOCK:
+            continue
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                comparisons += 1
+                if has_initial(a) == has_initial(b):
+                    # Dois nomes com inicial só se unem quando são a mesma grafia em outra ordem
+                    if sorted(a) == sorted(b) or (not has_initial(a) and same_person(a, b)):
+                        uf.union(a, b)
+                    continue
+                short, full = (a, b) if has_initial(a) else (b, a)
+                first = initial_match(short, full)
+                if first is not None:
+                    candidates[short].append((full, first))
+
+    # Depois dos grupos de nomes completos, cada grupo de abreviações entra (ou não) inteiro
+    groups = defaultdict(list)
+    for short, matches in candidates.items():
+        groups[uf.find(short)].extend(matches)
+    for root, matches in groups.items():
+        targets = {uf.find(full) for full, _ in matches}
+        firsts = [first for _, first in matches]
+        if len(targets) == 1 and all(similar(first, firsts[0]) for first in firsts):
+            uf.union(root, targets.pop())
+
+    print(f"{len(keys)} nomes distintos, {len(blocks)} blocos, {comparisons} comparações")
+    return {key: uf.find(key) for key in keys}
+
+
+def load_ids(path=IDS_FILE):
+    if os.path.isfile(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def save_ids(ids, path=IDS_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(ids, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def mint_id(members, used):
+    """Id novo a partir do menor nome do grupo, sem colidir com ids já existentes."""
+    seed = min(members)
+    for attempt in itertools.count():
+        text = seed if attempt == 0 else f"{seed}\0{attempt}"
+        speaker_id = "spk_" + hashlib.sha1(text.encode("utf-8")).hexdigest()[:10]
+        if speaker_id not in used:
+            return speaker_id
+
+
+def assign_ids(clusters, known):
+    """Id estável por grupo: o id já usado pela maioria dos membros, senão um id novo.
+
+    Cada id antigo fica com um único grupo, o que tem mais membros com ele (no
+    empate, o de menor nome); quando um grupo se divide, as outras partes ganham
+    ids novos em vez de continuarem com o mesmo.
+    """
+    claims = defaultdict(list)
+    for root, members in clusters.items():
+        for speaker_id, n in Counter(known[m] for m in members if m in known).items():
+            claims[speaker_id].append((-n, min(members), root))
+    owner = {speaker_id: min(claim)[2] for speaker_id, claim in claims.items()}
+
+    ids = {}
+    used = set(known.values())
+    for root, members in clusters.items():
+        previous = Counter(known[m] for m in members if m in known and owner[known[m]] == root)
+        if previous:
+            speaker_id = min(previous, key=lambda i: (-previous[i], i))
+        else:
+            speaker_id = mint_id(members, used)
+        used.add(speaker_id)
+        for member in members:
+            ids[member] = speaker_id
+    return ids
+
+
+def run(talks_csv=TALKS_CSV, ids_file=IDS_FILE):
+    talks = []
+    spellings = defaultdict(Counter)
+
+    with open(talks_csv, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            authors = []
+            for name in split_authors(row["autor"]):
+                tokens = name_tokens(name)
+                if tokens:
+                    key = " ".join(tokens)
+                    spellings[key][name] += 1
+                    authors.append((key, name))
+            talks.append((row, authors))
+
+    roots = resolve([tuple(key.split()) for key in spellings])
+    clusters = defaultdict(list)
+    for key, root in roots.items():
+        clusters[root].append(" ".join(key))
+
+    known = load_ids(ids_file)
+    ids = assign_ids(clusters, known)
+    known.update(ids)
+    save_ids(known, ids_file)
+
+    stats = defaultdict(lambda: {"talks": 0, "events": set(), "years": set(), "names": Counter()})
+    with open(TALK_SPEAKERS_CSV + ".tmp", "w", encoding="utf-8", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(["ano", "local", "titulo", "speaker_id", "autor"])
+        for row, authors in talks:
+            for key, name in authors:
+                speaker_id = ids[key]
+                writer.writerow([row["ano"], row["local"], row["titulo"], speaker_id, name])
+                s = stats[speaker_id]
+                s["talks"] += 1
+                s["events"].add((row["ano"], row["local"]))
+                s["years"].add(row["ano"])
+                s["names"][name] += 1
+    os.replace(TALK_SPEAKERS_CSV + ".tmp", TALK_SPEAKERS_CSV)
+
+    with open(SPEAKERS_CSV + ".tmp", "w", encoding="utf-8", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(["speaker_id", "nome", "talks", "eventos", "primeiro_ano", "ultimo_ano", "variantes"])
+        for speaker_id, s in sorted(stats.items(), key=lambda item: (-item[1]["talks"], item[0])):
+            # Nome canônico: a grafia mais usada; no empate, a mais completa
+            name = max(s["names"], key=lambda n: (s["names"][n], len(n)))
+            years = sorted(s["years"])
+            writer.writerow([
+                speaker_id, name, s["talks"], len(s["events"]), years[0], years[-1],
+                "; ".join(sorted(n for n in s["names"] if n != name)),
+            ])
+    os.replace(SPEAKERS_CSV + ".tmp", SPEAKERS_CSV)
+
+    print(f"{len(stats)} palestrantes em {SPEAKERS_CSV}; ligações talk → palestrante em {TALK_SPEAKERS_CSV}")
+    return stats
+
+
+def main():
+    run(sys.argv[1] if len(sys.argv) > 1 else TALKS_CSV)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import time
+
+JOURNAL_FILE = "talks_journal.jsonl"
+
+# Eventos com estes status não são reprocessados num reinício (só com revalidação)
+COMPLETE = {"done", "empty"}
+
+
+def content_hash(pages):
+    """Hash das páginas de programa usadas na extração (None = página inexistente)."""
+    h = hashlib.sha256()
+    for page in pages:
+        h.update((page or "").encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def load(path=JOURNAL_FILE):
+    """Lê o journal; a última entrada de cada URL de evento prevalece.
+
+    Uma linha final truncada (queda no meio da escrita) é ignorada.
+    """
+    entries = {}
+    if not os.path.isfile(path):
+        return entries
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entries[entry["url"]] = entry
+    return entries
+
+
+class Journal:
+    """Journal append-only por evento: url, status, hash do conteúdo e talks extraídas."""
+
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.entries = load(path)
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, "a", encoding="utf-8")
+        return self
+
+    def __exit__(self, *exc):
+        self.file.close()
+        self.file = None
+
+    def get(self, url):
+        return self.entries.get(url)
+
+    def is_complete(self, url):
+        entry = self.entries.get(url)
+        return entry is not None and entry["status"] in COMPLETE
+
+    def record(self, ev, status, digest=None, talks=None, error=None):
+        previous = self.entries.get(ev["url"])
+        if status != "done" and previous is not None and previous["status"] == "done":
+            # Falha ou página vazia numa revalidação não apaga talks já extraídas
+            return previous
+
+        entry = {
+            "url": ev["url"],
+            "year": ev["year"],
+            "event": ev["event"],
+            "status": status,
+            "hash": digest,
+            "talks": talks or [],
+            "error": error,
+            "at": int(time.time()),
+        }
+        self.entries[ev["url"]] = entry
+        self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return entry
+
+    def compact(self):
+        """Reescreve o journal só com a entrada mais recente de cada evento."""
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
@@ -0,0 +1,251 @@
+import os
+import re
+import string
+import subprocess
+import sys
+import time
+from collections import Counter
+
+STOPWORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stopwords.txt")
+
+# Acréscimos do projeto às listas do NLTK
+CUSTOM_STOPWORDS = [
+    "devopsdays", "event", "events", "program", "www", "http", "https",
+    "a", "the", "program", "contact", "events", "presentations", "blog",
+    "welcome", "reactions", "speakers", "participants", "intro", "video",
+    "slideshare", "for", "with", "in", "and", "not", "only", "ppt", "pdf",
+    "detail", "non", "do", "is", "all", "so", "how", "t", "of", "to", "non",
+    "not", "an",
+]
+
+_stopwords = None
+
+
+def build_stopwords(path=STOPWORDS_FILE):
+    """Gera o arquivo de stopwords a partir do NLTK. Único ponto que importa nltk."""
+    import nltk
+    from nltk.corpus import stopwords
+
+    nltk.download("stopwords", quiet=True)
+
+    words = set(w.lower() for w in stopwords.words("portuguese")) | set(
+        w.lower() for w in stopwords.words("english")
+    )
+    words.update(CUSTOM_STOPWORDS)
+    words = sorted(set(s.strip().lower() for s in words if s))
+
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("# Gerado por 'python tokenizer.py --gerar-stopwords' (NLTK portuguese + english + projeto)\n")
+        f.write("\n".join(words) + "\n")
+    os.replace(tmp, path)
+
+    print(f"{len(words)} stopwords salvas em {path}")
+    return frozenset(words)
+
+
+def load_stopwords(path=STOPWORDS_FILE):
+    """Carrega as stopwords do arquivo gerado. Nunca baixa nada: sem o arquivo, falha com a instrução."""
+    global _stopwords
+    if _stopwords is None:
+        if not os.path.isfile(path):
+            raise FileNotFoundError(
+                f"{path} não encontrado. Gere-o uma vez com 'python tokenizer.py --gerar-stopwords' "
+                "(requer nltk e acesso à rede para baixar o corpus de stopwords)."
+            )
+        with open(path, "r", encoding="utf-8") as f:
+            _stopwords = frozenset(
+                line.strip() for line in f if line.strip() and not line.startswith("#")
+            )
+    return _stopwords
+
+
+LETTER_WORD_RE = re.compile(r"[A-Za-zÀ-ÖØ-öø-ÿ]+(?:'[A-Za-zÀ-ÖØ-öø-ÿ]+)?", re.UNICODE)
+
+STRIP_CHARS = string.punctuation + " \t\n\r"
+
+
+class Tokenizer:
+    """Tokenizador com tabela de decisões por token bruto.
+
+    Cada forma distinta que a regex encontra passa uma única vez pela
+    normalização e pelos filtros; daí em diante é só um acesso ao dicionário
+    (token bruto -> termo normalizado, ou "" quando descartado).
+    """
+
+    def __init__(self, stopwords=None, min_len=2):
+        self.stopwords = load_stopwords() if stopwords is None else frozenset(stopwords)
+        self.min_len = min_len
+        self.table = _DecisionTable(self)
+
+    def decide(self, raw):
+        token = raw.strip(STRIP_CHARS).lower()
+        if len(token) < self.min_len:
+            return ""
+        if any(ch.isdigit() for ch in token):
+            return ""
+        if token in self.stopwords:
+            return ""
+        return token
+
+    def iter_tokens(self, text):
+        """Gera os termos de um texto sem montar a lista intermediária de palavras."""
+        table = self.table
+        for match in LETTER_WORD_RE.finditer(text):
+            token = table[match.group()]
+            if token:
+                yield token
+
+    def tokens(self, text):
+        return list(filter(None, map(self.table.__getitem__, LETTER_WORD_RE.findall(text))))
+
+    def slots(self, text):
+        """Como tokens(), mas com "" no lugar de cada token descartado: o índice é a posição no texto."""
+        return list(map(self.table.__getitem__, LETTER_WORD_RE.findall(text)))
+
+    def count(self, texts):
+        """Conta os termos de um corpus inteiro.
+
+        Conta primeiro as formas brutas (em C, via Counter) e só depois aplica
+        os filtros, uma vez por forma distinta.
+        """
+        raw = Counter()
+        for text in texts:
+            raw.update(LETTER_WORD_RE.findall(text))
+
+        table = self.table
+        counts = Counter()
+        for form, n in raw.items():
+            token = table[form]
+            if token:
+                counts[token] += n
+        return counts
+
+
+class _DecisionTable(dict):
+    def __init__(self, tokenizer):
+        super().__init__()
+        self.tokenizer = tokenizer
+
+    def __missing__(self, raw):
+        token = self[raw] = self.tokenizer.decide(raw)
+        return token
+
+
+_default = None
+
+
+def default_tokenizer():
+    global _default
+    if _default is None:
+        _default = Tokenizer()
+    return _default
+
+
+def extract_words(text):
+    return default_tokenizer().tokens(text)
+
+
+def extract_word_slots(text):
+    return default_tokenizer().slots(text)
+
+
+def legacy_extract_words(text):
+    """Implementação anterior (findall + normalize_token + contains_digit), mantida para o benchmark."""
+    stopwords = load_stopwords()
+    filtered = []
+    for w in LETTER_WORD_RE.findall(text):
+        w_norm = w.strip(string.punctuation + " \t\n\r").lower()
+        if not w_norm:
+            continue
+        if any(ch.isdigit() for ch in w_norm):
+            continue
+        if len(w_norm) <= 1:
+            continue
+        if w_norm in stopwords:
+            continue
+        filtered.append(w_norm)
+    return filtered
+
+
+def load_pdf_texts(base_folder):
+    from PyPDF2 import PdfReader
+
+    texts = []
+    for root, _, files in os.walk(base_folder):
+        for file in sorted(files):
+            if not file.lower().endswith(".pdf"):
+                continue
+            try:
+                reader = PdfReader(os.path.join(root, file))
+                texts.append("\n".join(page.extract_text() or "" for page in reader.pages))
+            except Exception as e:
+                print(f"Erro ao ler PDF {file}: {e}")
+    return texts
+
+
+def _run_tokens(texts):
+    tokenizer = Tokenizer()
+    return [tokenizer.tokens(t) for t in texts]
+
+
+def _run_iter_tokens(texts):
+    tokenizer = Tokenizer()
+    return [sum(1 for _ in tokenizer.iter_tokens(t)) for t in texts]
+
+
+def benchmark(texts, repeat=3):
+    """Mede tokens/segundo da implementação antiga e das novas sobre os mesmos textos.
+
+    Cada execução começa com um Tokenizer novo, então o custo de montar a
+    tabela de decisões entra na medida.
+    """
+    expected = [legacy_extract_words(t) for t in texts]
+    assert _run_tokens(texts) == expected
+
+    total = sum(map(len, expected))
+    runs = {
+        "legado (findall + filtros por token)": lambda: [legacy_extract_words(t) for t in texts],
+        "Tokenizer.tokens": lambda: _run_tokens(texts),
+        "Tokenizer.iter_tokens": lambda: _run_iter_tokens(texts),
+        "Tokenizer.count (corpus)": lambda: Tokenizer().count(texts),
+    }
+
+    print(f"{len(texts)} documentos, {sum(map(len, texts))} caracteres, {total} tokens úteis")
+    for name, run in runs.items():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:40s} {best * 1000:8.1f} ms  {total / best:12,.0f} tokens/s")
+
+
+def startup_times(modules=("pdfToCsv", "paginaWebToCsv", "tokenizer"), repeat=5):
+    """Mede o tempo de importação (partida a frio) de cada script em um interpretador novo."""
+    def best_of(code):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(STOPWORDS_FILE))
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    base = best_of("pass")
+    print(f"{'interpretador vazio':40s} {base * 1000:8.1f} ms")
+    for module in modules:
+        elapsed = best_of(f"import {module}; {module}.__name__")
+        print(f"{'import ' + module:40s} {elapsed * 1000:8.1f} ms  (+{(elapsed - base) * 1000:.1f} ms)")
+
+    elapsed = best_of("import tokenizer; tokenizer.load_stopwords()")
+    print(f"{'tokenizer.load_stopwords()':40s} {elapsed * 1000:8.1f} ms  (+{(elapsed - base) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    if "--gerar-stopwords" in sys.argv:
+        build_stopwords()
+    elif "--partida" in sys.argv:
+        startup_times()
+    else:
+        # python tokenizer.py [pasta]  → benchmark sobre os PDFs de Past_Events
+        benchmark(load_pdf_texts(sys.argv[1] if len(sys.argv) > 1 else "Past_Events"))
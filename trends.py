@@ -0,0 +1,233 @@
+"""Tendências de temas por ano e país a partir das tabelas de palavras.
+
+Monta matrizes esparsas ano × termo e país × termo e calcula, com operações
+vetorizadas, TF-IDF, crescimento ano a ano e termos emergentes.
+
+Uso:
+    python trends.py                 # PDFs + páginas web
+    python trends.py pdf --janela 2
+"""
+import json
+import os
+import sys
+import time
+from array import array
+
+import numpy as np
+from scipy import sparse
+
+import word_store
+from export_columnar import split_event
+
+SOURCES = {
+    "pdf": "words_from_pdfs.csv",
+    "web": "words_from_webpage.csv",
+}
+REPORT_FILE = "trends_report.json"
+TOP_N = 20
+# Ocorrências mínimas no período para um termo entrar nos rankings de crescimento
+MIN_COUNT = 5
+# Anos mais recentes comparados com todos os anteriores nos termos emergentes
+WINDOW = 3
+UNKNOWN_COUNTRY = ""
+
+
+def source_path(output_csv):
+    """Usa o CSV de frequência (*_tf.csv) quando existe: bem menor que o de ocorrências."""
+    tf = word_store.tf_path(output_csv)
+    return tf if os.path.isfile(tf) else output_csv
+
+
+class TermMatrix:
+    """Contagens ano × termo e país × termo em CSR, com os rótulos de cada eixo."""
+
+    def __init__(self, years, countries, terms, by_year, by_country):
+        self.years = years
+        self.countries = countries
+        self.terms = terms
+        self.by_year = by_year
+        self.by_country = by_country
+
+    @classmethod
+    def load(cls, paths):
+        term_ids = {}
+        year_ids = {}
+        country_ids = {}
+        event_country = {}
+        year_rows = array("i")
+        country_rows = array("i")
+        cols = array("i")
+        vals = array("q")
+
+        for path in paths:
+            for year, event, term, count in word_store.iter_counts(path):
+                if event not in event_country:
+                    event_country[event] = country_ids.setdefault(
+                        split_event(event)[1] or UNKNOWN_COUNTRY, len(country_ids)
+                    )
+                year_rows.append(year_ids.setdefault(year, len(year_ids)))
+                country_rows.append(event_country[event])
+                cols.append(term_ids.setdefault(term, len(term_ids)))
+                vals.append(count)
+
+        # Anos em ordem cronológica: renumera as linhas
+        labels = np.array([int(y) for y in year_ids], dtype=np.int32)
+        order = np.argsort(labels)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        year_rows = rank[np.frombuffer(year_rows, dtype=np.int32)]
+
+        cols = np.frombuffer(cols, dtype=np.int32)
+        vals = np.frombuffer(vals, dtype=np.int64)
+        shape_y = (len(year_ids), len(term_ids))
+        shape_c = (len(country_ids), len(term_ids))
+
+        # coo → csr soma as entradas repetidas (mesmo ano/termo vindo de vários eventos)
+        by_year = sparse.coo_matrix((vals, (year_rows, cols)), shape=shape_y).tocsr()
+        by_country = sparse.coo_matrix(
+            (vals, (np.frombuffer(country_rows, dtype=np.int32), cols)), shape=shape_c
+        ).tocsr()
+
+        return cls(
+            labels[order],
+            np.array(list(country_ids), dtype=object),
+            np.array(list(term_ids), dtype=object),
+            by_year,
+            by_country,
+        )
+
+
+def tfidf(counts):
+    """TF-IDF por linha: frequência relativa × log((1 + n) / (1 + df)) + 1."""
+    counts = counts.astype(np.float64)
+    totals = np.asarray(counts.sum(axis=1)).ravel()
+    totals[totals == 0] = 1
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log((1 + counts.shape[0]) / (1 + df)) + 1
+    return (sparse.diags(1 / totals) @ counts @ sparse.diags(idf)).tocsr()
+
+
+def smoothed_log_ratio(current, previous):
+    """log2 da razão das frequências relativas, com suavização de Laplace (termo novo não vira infinito)."""
+    vocab = current.shape[-1]
+    cur = (current + 1) / (current.sum(axis=-1, keepdims=True) + vocab)
+    prev = (previous + 1) / (previous.sum(axis=-1, keepdims=True) + vocab)
+    return np.log2(cur / prev)
+
+
+def year_over_year(by_year, years, min_count=MIN_COUNT):
+    """Crescimento anual de cada ano em relação ao ano presente anterior: matriz (anos - 1) × termos.
+
+    Com lacunas na série (ex.: 2019 → 2022), o log da razão é dividido pelo
+    número de anos entre os dois, para não comparar saltos de vários anos com
+    variações de um ano só.
+    """
+    dense = by_year.toarray()
+    gaps = np.diff(np.asarray(years, dtype=np.float64))[:, np.newaxis]
+    growth = smoothed_log_ratio(dense[1:], dense[:-1]) / gaps
+    growth[dense[1:] < min_count] = -np.inf
+    return growth
+
+
+def emerging(by_year, window=WINDOW, min_count=MIN_COUNT):
+    """Frequência dos últimos `window` anos contra a de todos os anos anteriores."""
+    if by_year.shape[0] <= window:
+        return np.full(by_year.shape[1], -np.inf)
+
+    recent = np.asarray(by_year[-window:].sum(axis=0)).ravel()
+    before = np.asarray(by_year[:-window].sum(axis=0)).ravel()
+    score = smoothed_log_ratio(recent, before)
+    score[recent < min_count] = -np.inf
+    return score
+
+
+def top_dense(values, n=TOP_N):
+    """Índices dos n maiores valores finitos, em ordem decrescente (argpartition, sem ordenar tudo)."""
+    finite = np.flatnonzero(np.isfinite(values))
+    if len(finite) > n:
+        finite = finite[np.argpartition(values[finite], -n)[-n:]]
+    return finite[np.argsort(values[finite])[::-1]]
+
+
+def top_sparse_row(matrix, row, n=TOP_N):
+    start, end = matrix.indptr[row], matrix.indptr[row + 1]
+    data = matrix.data[start:end]
+    keep = top_dense(data, n)
+    return matrix.indices[start:end][keep], data[keep]
+
+
+def build_report(tm, window=WINDOW, n=TOP_N):
+    year_tfidf = tfidf(tm.by_year)
+    country_tfidf = tfidf(tm.by_country)
+    growth = year_over_year(tm.by_year, tm.years)
+    emerging_scores = emerging(tm.by_year, window)
+    year_counts = tm.by_year.toarray()
+
+    report = {"years": {}, "countries": {}, "emerging": []}
+
+    for i, year in enumerate(tm.years):
+        terms, scores = top_sparse_row(year_tfidf, i, n)
+        entry = {
+            "tokens": int(year_counts[i].sum()),
+            "tfidf": [[tm.terms[t], round(float(s), 6)] for t, s in zip(terms, scores)],
+        }
+        if i > 0:
+            rising = top_dense(growth[i - 1], n)
+            entry["growth_since"] = int(tm.years[i - 1])
+            entry["growth"] = [
+                [tm.terms[t], round(float(growth[i - 1, t]), 3), int(year_counts[i, t])] for t in rising
+            ]
+        report["years"][str(year)] = entry
+
+    for i, country in enumerate(tm.countries):
+        if country == UNKNOWN_COUNTRY:
+            continue
+        terms, scores = top_sparse_row(country_tfidf, i, n)
+        report["countries"][country] = [[tm.terms[t], round(float(s), 6)] for t, s in zip(terms, scores)]
+
+    report["emerging"] = [
+        [tm.terms[t], round(float(emerging_scores[t]), 3)] for t in top_dense(emerging_scores, n)
+    ]
+    return report
+
+
+def write_report(report, path=REPORT_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def main():
+    args = sys.argv[1:]
+    window = WINDOW
+    if "--janela" in args:
+        i = args.index("--janela")
+        window = int(args[i + 1])
+        del args[i:i + 2]
+
+    names = [a for a in args if not a.startswith("--")] or list(SOURCES)
+    paths = [source_path(SOURCES[name]) for name in names if os.path.isfile(source_path(SOURCES[name]))]
+    if not paths:
+        print("Nenhuma tabela de palavras encontrada.")
+        return
+
+    start = time.perf_counter()
+    tm = TermMatrix.load(paths)
+    loaded = time.perf_counter()
+    report = build_report(tm, window)
+    report["sources"] = paths
+    report["window"] = window
+    write_report(report)
+    done = time.perf_counter()
+
+    print(
+        f"{len(tm.years)} anos × {len(tm.terms)} termos, {len(tm.countries)} países "
+        f"(carga {loaded - start:.2f}s, análise {done - loaded:.3f}s) → {REPORT_FILE}"
+    )
+    if report["emerging"]:
+        print("Emergentes:", ", ".join(term for term, _ in report["emerging"][:10]))
+
+
+if __name__ == "__main__":
+    main()
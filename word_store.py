@@ -0,0 +1,162 @@
+import csv
+import gzip
+import json
+import os
+import sys
+from collections import Counter
+
+TF_HEADER = ["Ano", "Evento", "Palavra", "Contagem"]
+STORE_VERSION = 1
+
+
+def base_name(output_csv):
+    root, _ = os.path.splitext(output_csv)
+    return root[: -len("_tf")] if root.endswith("_tf") else root
+
+
+def tf_path(output_csv):
+    """words_from_pdfs.csv -> words_from_pdfs_tf.csv"""
+    return f"{base_name(output_csv)}_tf.csv"
+
+
+def columnar_path(output_csv):
+    """words_from_pdfs.csv -> words_from_pdfs.tf.json.gz"""
+    return f"{base_name(output_csv)}.tf.json.gz"
+
+
+def save_term_counts(year, event, words, output_csv):
+    """Grava (ano, evento, termo, contagem) para um documento, em vez de uma linha por ocorrência.
+
+    Anexa ao arquivo: quem chama escreve num arquivo novo a cada execução (ver
+    rebuild_output em pdfToCsv e main em paginaWebToCsv), senão compact somaria
+    as contagens de execuções anteriores.
+    """
+    counts = Counter(words)
+    file_exists = os.path.isfile(output_csv)
+
+    with open(output_csv, "a", encoding="utf-8", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+
+        if not file_exists:
+            writer.writerow(TF_HEADER)
+
+        for term, count in counts.most_common():
+            writer.writerow([year, event, term, count])
+
+    return counts
+
+
+def iter_counts(path):
+    """Lê um CSV de palavras e devolve (ano, evento, termo, contagem).
+
+    Aceita tanto o formato por ocorrência (Ano,Evento,Palavra) quanto o de frequência.
+    """
+    with open(path, "r", encoding="utf-8") as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if header is None:
+            return
+        has_count = len(header) > 3
+
+        for row in reader:
+            if len(row) < 3:
+                continue
+            yield row[0], row[1], row[2], int(row[3]) if has_count else 1
+
+
+def aggregate(path):
+    totals = Counter()
+    for year, event, term, count in iter_counts(path):
+        totals[(year, event, term)] += count
+    return totals
+
+
+def write_tf_csv(totals, output_csv):
+    tmp = output_csv + ".tmp"
+    with open(tmp, "w", encoding="utf-8", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(TF_HEADER)
+        for (year, event, term), count in sorted(
+            totals.items(), key=lambda item: (int(item[0][0]), item[0][1], -item[1], item[0][2])
+        ):
+            writer.writerow([year, event, term, count])
+    os.replace(tmp, output_csv)
+
+
+def write_columnar(totals, path):
+    """Versão compacta: termos e eventos viram IDs de dicionário e as colunas são listas de inteiros.
+
+    As linhas ficam ordenadas por (evento, contagem desc), então o top-N de um evento é uma fatia.
+    """
+    terms = sorted({term for _, _, term in totals})
+    term_ids = {term: i for i, term in enumerate(terms)}
+
+    events = sorted({(year, event) for year, event, _ in totals}, key=lambda e: (int(e[0]), e[1]))
+    event_ids = {key: i for i, key in enumerate(events)}
+
+    rows = sorted(
+        ((event_ids[(year, event)], term_ids[term], count) for (year, event, term), count in totals.items()),
+        key=lambda r: (r[0], -r[2], r[1]),
+    )
+
+    offsets = [0] * (len(events) + 1)
+    for event_id, _, _ in rows:
+        offsets[event_id + 1] += 1
+    for i in range(len(events)):
+        offsets[i + 1] += offsets[i]
+
+    store = {
+        "version": STORE_VERSION,
+        "terms": terms,
+        "events": [list(e) for e in events],
+        "offsets": offsets,
+        "term_id": [r[1] for r in rows],
+        "count": [r[2] for r in rows],
+    }
+
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(store, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def load_columnar(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        store = json.load(f)
+    if store.get("version") != STORE_VERSION:
+        raise ValueError(f"Versão de {path} não suportada: {store.get('version')}")
+    return store
+
+
+def top_terms(store, year, event, n=10):
+    """Top-N termos de um evento a partir do store colunar."""
+    try:
+        event_id = store["events"].index([str(year), event])
+    except ValueError:
+        return []
+
+    start = store["offsets"][event_id]
+    end = min(store["offsets"][event_id + 1], start + n)
+    return [
+        (store["terms"][store["term_id"][i]], store["count"][i])
+        for i in range(start, end)
+    ]
+
+
+def compact(output_csv):
+    """Gera o CSV de frequências e a versão colunar a partir de um CSV de palavras."""
+    totals = aggregate(output_csv)
+
+    write_tf_csv(totals, tf_path(output_csv))
+    write_columnar(totals, columnar_path(output_csv))
+
+    print(
+        f"{sum(totals.values())} ocorrências → {len(totals)} linhas em "
+        f"{tf_path(output_csv)} e {columnar_path(output_csv)}"
+    )
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:] or ["words_from_pdfs.csv", "words_from_webpage.csv"]:
+        if os.path.isfile(path):
+            compact(path)